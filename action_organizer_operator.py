@@ -1,6 +1,44 @@
 import bpy
 import os
+import sys
 import math
+import fnmatch
+import contextlib
+
+from . import conversion_planner
+from . import datablocks
+from . import group_export
+from . import journal
+from . import manifest
+from . import memory
+from . import name_patterns
+from . import profiling
+
+class ConversionError(Exception):
+    pass
+
+class GroupConversionResult:
+    # What converting a single action group produced.
+
+    def __init__(self, action_group_name):
+        self.action_group_name = action_group_name
+        self.baked_actions = []
+        self.frames = 0
+        self.keys_written = 0
+        self.keys_before_reduction = 0
+        self.keys_after_reduction = 0
+        self.timing = None
+        # Datablocks the conversion created or filled, by bpy.data collection name, and the frame range that was baked.
+        self.created_datablocks = {}
+        self.frame_range = None
+        # (rig object, baked action) of each rig baked by the built-in bake engine.
+        self.rig_actions = []
+        self.export_path = None
+        # Rigs that were not baked again because an earlier group in the run made the same bake. They get a copy of the earlier bake.
+        self.reused_rigs = []
+        self.library_path = None
+        # Resident memory of the process in bytes after the conversion and cleanup, if it is known.
+        self.resident_memory = None
 
 #
 # Helper functions.
@@ -11,13 +49,679 @@ def active_group_index_is_valid(properties):
     index = properties.active_action_group_index
     return group_count > 0 and index >= 0 and index < group_count
 
+# Index of rig conversion properties by rig name for each scene, so that looking up the settings of a rig does not scan the whole collection.
+# Entries are checked against the collection when they are used and rebuilt if they have gone stale, and the whole cache is dropped on undo and file load.
+rig_conversion_index_cache = {}
+
+def invalidate_rig_conversion_index(*args):
+    rig_conversion_index_cache.clear()
+
+def build_rig_conversion_index(properties):
+    index = {}
+    for i, rig_conversion_property in enumerate(properties.rig_conversion_properties):
+        if rig_conversion_property.rig_object != None:
+            index.setdefault(rig_conversion_property.rig_object.name_full, i)
+    rig_conversion_index_cache[properties.as_pointer()] = index
+    return index
+
+def find_rig_conversion_property(properties, rig_object, index):
+    i = index.get(rig_object.name_full)
+    if i == None or i >= len(properties.rig_conversion_properties):
+        return None
+    rig_conversion_property = properties.rig_conversion_properties[i]
+    return rig_conversion_property if rig_conversion_property.rig_object == rig_object else None
+
+def get_rig_conversion_property(context, rig_object):
+    if rig_object == None:
+        raise ConversionError("Can not get conversion settings of an empty rig")
+
+    properties = context.scene.action_organizer
+    index = rig_conversion_index_cache.get(properties.as_pointer())
+    if index != None:
+        rig_conversion_property = find_rig_conversion_property(properties, rig_object, index)
+        if rig_conversion_property != None:
+            return rig_conversion_property
+
+    # The rig was not found in the cached index, which might just mean that the index is out of date.
+    rig_conversion_property = find_rig_conversion_property(properties, rig_object, build_rig_conversion_index(properties))
+    if rig_conversion_property == None:
+        raise ConversionError(f"No conversion settings have been set for armature \"{rig_object.name}\"")
+    return rig_conversion_property
+
 def get_conversion_root_bone_name(context, rig_object):
+    return get_rig_conversion_property(context, rig_object).rig_root_name
+
+def add_missing_rig_conversion_properties(context):
+    # Adds conversion settings for the rigs of every action group that do not have them yet.
+    # Existing settings are kept, including those of rigs that are not in any group, since they may come from an imported manifest.
     properties = context.scene.action_organizer
-    return next(x.rig_root_name for x in properties.rig_conversion_properties if x.rig_object == rig_object)
+    rig_names = {x.rig_object.name_full for x in properties.rig_conversion_properties if x.rig_object != None}
+    for action_group in properties.action_groups:
+        for action_assignment in action_group.action_assignments:
+            rig_object = action_assignment.assigned_rig_object
+            if rig_object != None and rig_object.name_full not in rig_names:
+                properties.rig_conversion_properties.add().rig_object = rig_object
+                rig_names.add(rig_object.name_full)
+    invalidate_rig_conversion_index()
 
 def get_conversion_mesh(context, rig_object):
+    return get_rig_conversion_property(context, rig_object).mesh_object
+
+def converter_is_available():
+    # bpy.ops makes up an operator for any name, so the registered operator class is looked up instead.
+    return hasattr(bpy.types, "RIGIFY_CONVERTER_OT_convert")
+
+def bake_engine_is_available(context):
+    # The built-in bake engine is always there, while the rigify converter depends on its addon being enabled.
+    return context.scene.action_organizer.bake_engine == "NATIVE" or converter_is_available()
+
+def get_action_group_problems(context, action_group):
+    # Returns descriptions of everything that prevents the group from being converted. The list is empty if the group can be converted.
+    properties = context.scene.action_organizer
+    problems = []
+    for action_assignment in action_group.action_assignments:
+        rig_object = action_assignment.assigned_rig_object
+        if rig_object == None:
+            problems.append("An action in the group has not been assigned to a rig")
+            continue
+
+        try:
+            rig_conversion_property = get_rig_conversion_property(context, rig_object)
+        except ConversionError as e:
+            problems.append(str(e))
+            continue
+
+        # Check that root bones exist in the armature.
+        rig_root_name = rig_conversion_property.rig_root_name
+        if rig_root_name not in rig_object.data.bones:
+            problems.append(f"Root bone \"{rig_root_name}\" could not be found in armature \"{rig_object.name}\"")
+
+        # The built-in bake engine only bakes the rig, so it does not need a mesh.
+        if properties.bake_engine == "NATIVE":
+            continue
+
+        # Check that conversion meshes exist as a child of the armature.
+        # Comparing the parent is used instead of rig_object.children, which goes through every object in the file.
+        mesh_to_convert = rig_conversion_property.mesh_object
+        if mesh_to_convert == None:
+            problems.append(f"No mesh has been assigned to be converted with armature \"{rig_object.name}\"")
+        elif mesh_to_convert.parent != rig_object:
+            problems.append(f"Mesh \"{mesh_to_convert.name}\" could not be found in the children of armature \"{rig_object.name}\"")
+
+    return problems
+
+# Problems found in each action group, so that polling does not validate the group again on every redraw.
+# Entries are dropped when objects, armatures or the scene change, and also when the group's assignments no longer match the ones that were validated.
+action_group_problems_cache = {}
+
+def invalidate_action_group_problems(*args):
+    action_group_problems_cache.clear()
+
+def get_action_group_signature(action_group):
+    return tuple(
+        (
+            x.assigned_rig_object.as_pointer() if x.assigned_rig_object != None else 0,
+            x.action.as_pointer() if x.action != None else 0,
+        )
+        for x in action_group.action_assignments
+    )
+
+def get_cached_action_group_problems(context, action_group):
+    key = action_group.as_pointer()
+    signature = get_action_group_signature(action_group)
+    cached = action_group_problems_cache.get(key)
+    if cached != None and cached[0] == signature:
+        return cached[1]
+
+    problems = get_action_group_problems(context, action_group)
+    action_group_problems_cache[key] = (signature, problems)
+    return problems
+
+def compute_action_group_fingerprint(context, action_group):
+    # Fingerprint of everything that the conversion of the group depends on.
+    # The group name is included, since the baked actions and exported files are named after it.
+    from . import fingerprint
+
+    properties = context.scene.action_organizer
+    hasher = fingerprint.create_hasher()
+    fingerprint.update_with_values(
+        hasher,
+        action_group.name,
+        properties.bake_engine,
+        properties.bake_only_deform_bones,
+        properties.baked_action_suffix,
+        action_group.frame_range_source,
+        action_group.ignore_muted_fcurves,
+        action_group.ignore_hidden_fcurves,
+        action_group.use_manual_frame_ranges,
+        action_group.use_keyframe_reduction,
+        action_group.location_tolerance,
+        action_group.rotation_tolerance,
+        action_group.scale_tolerance,
+        action_group.remove_constant_channels,
+        properties.export_format,
+        properties.export_directory if properties.export_format != "NONE" else "",
+        properties.results_directory,
+    )
+    for action_assignment in action_group.action_assignments:
+        rig_object = action_assignment.assigned_rig_object
+        if rig_object == None:
+            fingerprint.update_with_values(hasher, None)
+        else:
+            try:
+                rig_conversion_property = get_rig_conversion_property(context, rig_object)
+                mesh_object = rig_conversion_property.mesh_object
+                fingerprint.update_with_values(
+                    hasher,
+                    rig_object.name_full,
+                    rig_conversion_property.rig_root_name,
+                    mesh_object.name_full if mesh_object != None else None,
+                )
+            except ConversionError:
+                fingerprint.update_with_values(hasher, rig_object.name_full, None)
+        fingerprint.update_with_action(hasher, action_assignment.action)
+    return hasher.hexdigest()
+
+def get_action_frame_range(action_group, action):
+    # Returns the frame range of the action as used by the conversion of the group, or None if the action has nothing to bake.
+    if action_group.frame_range_source == "KEYFRAMES" and not (action_group.use_manual_frame_ranges and action.use_frame_range):
+        from . import fcurve_utils
+        return fcurve_utils.get_keyframe_frame_range(
+            action,
+            ignore_muted=action_group.ignore_muted_fcurves,
+            ignore_hidden=action_group.ignore_hidden_fcurves,
+        )
+    return tuple(action.frame_range)
+
+def get_combined_frame_range(action_group):
+    # Calculate the combined frame range from the beginning of the earliest action to the end of the latest action.
+    combined_frame_range = (float("inf"), float("-inf"))
+    for action_assignment in action_group.action_assignments:
+        action = action_assignment.action
+        if action == None:
+            continue
+        frame_range = get_action_frame_range(action_group, action)
+        if frame_range == None:
+            continue
+        combined_frame_range = (
+            min(combined_frame_range[0], math.floor(frame_range[0])),
+            max(combined_frame_range[1], math.ceil(frame_range[1])),
+        )
+
+    if combined_frame_range[0] > combined_frame_range[1]:
+        raise ConversionError(f"Action group \"{action_group.name}\" has no keyframes to convert")
+
+    # Make frame range at least 2 frames long.
+    return (
+        combined_frame_range[0],
+        combined_frame_range[1] + 1 if combined_frame_range[0] == combined_frame_range[1] else combined_frame_range[1]
+    )
+
+def action_group_has_changed(context, action_group):
+    # Returns False if the group was successfully converted before and nothing it depends on has changed since.
+    return action_group.last_bake_fingerprint != compute_action_group_fingerprint(context, action_group)
+
+def assign_action_group_actions(action_group):
+    # Assigns the actions of the group to their rigs. Rigs that already have the action are left alone,
+    # since assigning an action tags the rig for re-evaluation even when it does not change.
+    # Returns the number of rigs whose action changed.
+    changed_count = 0
+    for action_assignment in action_group.action_assignments:
+        action = action_assignment.action
+        assigned_rig_object = action_assignment.assigned_rig_object
+        if action == None or assigned_rig_object == None:
+            continue
+        animation_data = assigned_rig_object.animation_data
+        if animation_data == None:
+            animation_data = assigned_rig_object.animation_data_create()
+        elif animation_data.action == action:
+            continue
+        animation_data.action = action
+        changed_count += 1
+    return changed_count
+
+def deselect_all_objects(context):
+    # Cheaper than bpy.ops.object.select_all, which goes through every object in the view layer and sends notifiers.
+    for selected_object in context.selected_objects:
+        selected_object.select_set(False)
+
+@contextlib.contextmanager
+def preserved_selection(context):
+    # Restores the selected objects, the active object and its mode when the block exits.
+    # Names are stored instead of the objects, since the block might remove or replace objects.
+    view_layer = context.view_layer
+    active_object = view_layer.objects.active
+    active_object_name = active_object.name if active_object != None else None
+    mode = active_object.mode if active_object != None else "OBJECT"
+    selected_object_names = [x.name for x in context.selected_objects]
+    try:
+        yield
+    finally:
+        if context.mode != "OBJECT":
+            bpy.ops.object.mode_set(mode="OBJECT")
+
+        selected_objects = [bpy.data.objects.get(x) for x in selected_object_names]
+        selected_objects = [x for x in selected_objects if x != None and x.name in view_layer.objects]
+        for selected_object in context.selected_objects:
+            if selected_object not in selected_objects:
+                selected_object.select_set(False)
+        for selected_object in selected_objects:
+            selected_object.select_set(True)
+
+        active_object = view_layer.objects.get(active_object_name) if active_object_name != None else None
+        view_layer.objects.active = active_object
+        if active_object != None and mode != "OBJECT":
+            bpy.ops.object.mode_set(mode=mode)
+
+def run_converter(context, rig_object, mesh_object, rig_root_name):
+    properties = context.scene.action_organizer
+    if properties.use_context_override:
+        # Hand the objects to the converter through the context, so that the selection in the view layer does not have to change.
+        converted_objects = [rig_object, mesh_object]
+        with context.temp_override(
+            active_object=rig_object,
+            object=rig_object,
+            selected_objects=converted_objects,
+            selected_editable_objects=converted_objects,
+        ):
+            bpy.ops.rigify_converter.convert(add_as_root_bone=rig_root_name)
+    else:
+        # Select the rig and mesh objects that are being converted.
+        deselect_all_objects(context)
+        rig_object.select_set(True)
+        mesh_object.select_set(True)
+        context.view_layer.objects.active = rig_object
+        bpy.ops.rigify_converter.convert(add_as_root_bone=rig_root_name)
+
+# Longest datablock name Blender keeps without cutting it short, in bytes.
+MAX_DATABLOCK_NAME_LENGTH = 63
+
+def get_baked_action_name(context, action_group, rig_object):
+    # Each rig of each group gets an action of its own. Naming baked actions after their source action would make rigs that share
+    # an action, and groups that bake the same action with different partner rigs, overwrite each other's bakes.
+    properties = context.scene.action_organizer
+    return f"{action_group.name}_{rig_object.name}{properties.baked_action_suffix}"
+
+def check_baked_action_names(action_group, names):
+    # Raises ConversionError if two bakes of the group would end up in the same action.
+    # A name that is too long would be cut short by Blender, which can make names that were different the same.
+    for name in names:
+        if len(name.encode("utf-8")) > MAX_DATABLOCK_NAME_LENGTH:
+            raise ConversionError(f"Action group \"{action_group.name}\": baked action name \"{name}\" is longer than {MAX_DATABLOCK_NAME_LENGTH} bytes, use shorter group or rig names")
+    duplicate_names = sorted({x for x in names if names.count(x) > 1})
+    if duplicate_names:
+        raise ConversionError(f"Action group \"{action_group.name}\": more than one rig would be baked into \"{duplicate_names[0]}\"")
+
+def get_bone_names_to_bake(context, rig_object):
+    properties = context.scene.action_organizer
+    rig_root_name = get_conversion_root_bone_name(context, rig_object)
+    if properties.bake_only_deform_bones:
+        return [x.name for x in rig_object.data.bones if x.use_deform or x.name == rig_root_name]
+    return [x.name for x in rig_object.data.bones]
+
+def convert_action_group(context, action_group, restore_selection=True, profiler=None, reused_rigs=None):
+    # Bakes every action in the group with the chosen bake engine. Raises ConversionError if the group can not be converted.
+    # When converting many groups, pass restore_selection=False and restore the selection around all of them at once instead.
+    # Pass a profiler to collect the timing of the conversion.
+    # reused_rigs maps names of rigs that are not baked to the earlier group that already made the same bake. See plan_conversion.
+    if restore_selection:
+        with preserved_selection(context):
+            return convert_action_group(context, action_group, restore_selection=False, profiler=profiler, reused_rigs=reused_rigs)
+
+    if profiler == None:
+        profiler = profiling.BakeProfiler()
+    with profiler.group(action_group.name) as timing:
+        result = convert_action_group_with_profiler(context, action_group, profiler, reused_rigs or {})
+        timing.frames = result.frames
+        timing.keys_written = result.keys_written
+        result.timing = timing
+    return result
+
+def convert_action_group_with_profiler(context, action_group, profiler, reused_rigs):
+    if not bake_engine_is_available(context):
+        raise ConversionError("Can not convert action groups if action converter addon is not enabled")
+    properties = context.scene.action_organizer
+    if properties.export_format != "NONE" and not group_export.exporter_is_available(properties.export_format):
+        raise ConversionError(f"Can not export converted action groups if the {properties.export_format} exporter addon is not enabled")
+    check_memory_limit(context, action_group)
+
+    with profiler.section("validation"):
+        problems = get_action_group_problems(context, action_group)
+    if problems:
+        raise ConversionError(f"Action group \"{action_group.name}\": {'; '.join(problems)}")
+
+    # Fingerprint the inputs before converting, in case the conversion touches them.
+    with profiler.section("fingerprint"):
+        group_fingerprint = compute_action_group_fingerprint(context, action_group)
+
+    with profiler.section("mode_and_actions"):
+        if not context.mode == "OBJECT":
+            bpy.ops.object.mode_set(mode="OBJECT")
+
+        # Set animation data for all rigs in the group.
+        # This ensures that animations on different rigs that rely on each other bake correcly, which is basically the whole point of this addon.
+        for action_assignment in action_group.action_assignments:
+            assigned_rig_object = action_assignment.assigned_rig_object
+            action = action_assignment.action
+            if action != None:
+                if assigned_rig_object.animation_data == None:
+                    assigned_rig_object.animation_data_create()
+                assigned_rig_object.animation_data.action = action
+
+    with profiler.section("frame_range"):
+        combined_frame_range = get_combined_frame_range(action_group)
+    result = GroupConversionResult(action_group.name)
+    result.frames = int(combined_frame_range[1] - combined_frame_range[0]) + 1
+    result.frame_range = combined_frame_range
+
+    # The actions of reused rigs are still assigned above, since the other rigs of the group may depend on them.
+    reused_actions = get_reused_baked_actions(context, action_group, reused_rigs) if properties.bake_engine == "NATIVE" else []
+    result.reused_rigs = [x[0] for x in reused_actions]
+
+    snapshot = datablocks.DatablockSnapshot()
+    if properties.bake_engine == "NATIVE":
+        # All rigs are baked during the same pass over the frame range.
+        bake_jobs = [
+            (x.assigned_rig_object, get_bone_names_to_bake(context, x.assigned_rig_object), get_baked_action_name(context, action_group, x.assigned_rig_object))
+            for x in action_group.action_assignments if x.action != None and x.assigned_rig_object not in result.reused_rigs
+        ]
+        check_baked_action_names(action_group, [x[2] for x in bake_jobs] + [get_baked_action_name(context, action_group, x) for x in result.reused_rigs])
+        if bake_jobs:
+            from . import bake_engine
+            result.baked_actions = bake_engine.bake_rigs(context, bake_jobs, combined_frame_range, profiler)
+        result.rig_actions = [(x[0], action) for x, action in zip(bake_jobs, result.baked_actions)]
+        result.created_datablocks = {"actions": list(result.baked_actions)}
+    else:
+        convert_with_rigify_converter(context, action_group, combined_frame_range, profiler)
+        result.created_datablocks = snapshot.all_new_datablocks()
+        result.baked_actions = result.created_datablocks["actions"]
+
+    if action_group.use_keyframe_reduction:
+        with profiler.section("keyframe_reduction"):
+            reduce_baked_actions(action_group, result)
+
+    # Copies of earlier bakes are added after the reduction, since the earlier group already reduced them.
+    if reused_actions:
+        with profiler.section("reuse"):
+            for rig_object, earlier_action in reused_actions:
+                action = copy_baked_action(earlier_action, get_baked_action_name(context, action_group, rig_object))
+                result.baked_actions.append(action)
+                result.rig_actions.append((rig_object, action))
+                result.created_datablocks["actions"].append(action)
+
+    result.keys_written = sum(len(x.keyframe_points) for action in result.baked_actions for x in action.fcurves)
+
+    if properties.export_format != "NONE":
+        with profiler.section("export"):
+            export_conversion_result(context, action_group, result)
+
+    if properties.results_directory != "":
+        with profiler.section("write_results"):
+            write_conversion_result(context, action_group, result)
+
+    if properties.remove_conversion_orphans:
+        with profiler.section("cleanup"):
+            snapshot.remove_new_orphans()
+    result.resident_memory = memory.get_resident_memory()
+
+    action_group.last_bake_fingerprint = group_fingerprint
+    return result
+
+def get_reused_baked_actions(context, action_group, reused_rigs):
+    # Returns (rig object, baked action of the earlier group) of the rigs whose bake can be reused.
+    # A rig whose earlier bake is no longer in the file is baked again instead.
+    reused_actions = []
+    for action_assignment in action_group.action_assignments:
+        rig_object = action_assignment.assigned_rig_object
+        earlier_group = reused_rigs.get(rig_object.name_full) if action_assignment.action != None else None
+        if earlier_group == None:
+            continue
+        earlier_action = bpy.data.actions.get(get_baked_action_name(context, earlier_group, rig_object))
+        if earlier_action != None:
+            reused_actions.append((rig_object, earlier_action))
+    return reused_actions
+
+def copy_baked_action(action, name):
+    # Replaces the action from an earlier bake of the same name, so that re-baking does not leave numbered copies behind.
+    existing_action = bpy.data.actions.get(name)
+    if existing_action != None:
+        bpy.data.actions.remove(existing_action)
+    copied_action = action.copy()
+    copied_action.name = name
+    copied_action.use_fake_user = True
+    return copied_action
+
+def write_conversion_result(context, action_group, result):
+    # Moves the datablocks the group created to a library file named after the group, so that they do not stay in memory for the rest of the run.
+    properties = context.scene.action_organizer
+    created_datablocks = {x for values in result.created_datablocks.values() for x in values}
+    if not created_datablocks:
+        return
+
+    directory = bpy.path.abspath(properties.results_directory)
+    path = os.path.join(directory, f"{bpy.path.clean_name(action_group.name)}.blend")
+    try:
+        os.makedirs(directory, exist_ok=True)
+        bpy.data.libraries.write(path, created_datablocks, fake_user=True)
+    except (OSError, RuntimeError) as e:
+        raise ConversionError(f"Action group \"{action_group.name}\": could not write results to {path}: {e}")
+    result.library_path = path
+
+    bpy.data.batch_remove(created_datablocks)
+    result.created_datablocks = {}
+    result.baked_actions = []
+    result.rig_actions = []
+
+def memory_limit_can_be_checked(context):
+    # Returns False if a memory limit is set but the memory use of Blender can not be read on this system.
+    return context.scene.action_organizer.memory_limit <= 0 or memory.get_resident_memory() != None
+
+def report_unchecked_memory_limit(operator, context):
+    if not memory_limit_can_be_checked(context):
+        operator.report({"WARNING"}, "The memory limit is ignored, since the memory use of Blender can not be read on this system")
+
+def check_memory_limit(context, action_group):
+    # Refuses to start converting a group once the process uses more memory than allowed, instead of letting the machine run out.
+    properties = context.scene.action_organizer
+    if properties.memory_limit <= 0:
+        return
+    resident_memory = memory.get_resident_memory()
+    if resident_memory != None and resident_memory > properties.memory_limit * 1024 * 1024:
+        raise ConversionError(
+            f"Action group \"{action_group.name}\": Blender uses {resident_memory / (1024 * 1024):.0f} MB, "
+            f"which is more than the memory limit of {properties.memory_limit} MB"
+        )
+
+def export_conversion_result(context, action_group, result):
+    # Exports the baked rigs and their meshes to a file named after the group, and removes the baked datablocks afterwards if asked to.
     properties = context.scene.action_organizer
-    return next(x.mesh_object for x in properties.rig_conversion_properties if x.rig_object == rig_object)
+    path = group_export.get_export_path(bpy.path.abspath(properties.export_directory), action_group.name, properties.export_format)
+
+    if properties.bake_engine == "NATIVE":
+        object_actions = dict(result.rig_actions)
+        objects = list(object_actions)
+        for rig_object in object_actions:
+            try:
+                mesh_object = get_rig_conversion_property(context, rig_object).mesh_object
+            except ConversionError:
+                continue
+            if mesh_object != None:
+                objects.append(mesh_object)
+    else:
+        # The converter creates new armatures and meshes that already have the baked actions.
+        object_actions = {}
+        objects = [x for x in result.created_datablocks.get("objects", []) if x.type in {"ARMATURE", "MESH"}]
+
+    try:
+        group_export.export_objects(context, objects, object_actions, result.frame_range, path, properties.export_format)
+    except (OSError, RuntimeError) as e:
+        raise ConversionError(f"Action group \"{action_group.name}\": could not export to {path}: {e}")
+    result.export_path = path
+
+    if properties.free_after_export:
+        group_export.remove_datablocks(result.created_datablocks)
+        result.created_datablocks = {}
+        result.baked_actions = []
+        result.rig_actions = []
+
+def reduce_baked_actions(action_group, result):
+    from . import keyframe_reduction
+
+    tolerances = {
+        "location": action_group.location_tolerance,
+        "rotation": action_group.rotation_tolerance,
+        "scale": action_group.scale_tolerance,
+    }
+    for action in result.baked_actions:
+        keys_before, keys_after = keyframe_reduction.reduce_action(action, tolerances, action_group.remove_constant_channels)
+        result.keys_before_reduction += keys_before
+        result.keys_after_reduction += keys_after
+
+def convert_with_rigify_converter(context, action_group, combined_frame_range, profiler):
+    for action_assignment in action_group.action_assignments:
+        assigned_rig_object = action_assignment.assigned_rig_object
+        action = action_assignment.action
+        if action == None:
+            continue
+
+        with profiler.rig(assigned_rig_object.name):
+            # Get the mesh and the root bone used in the conversion.
+            rig_conversion_property = get_rig_conversion_property(context, assigned_rig_object)
+            mesh_to_convert = rig_conversion_property.mesh_object
+            rig_root_name = rig_conversion_property.rig_root_name
+
+            # Set the action that is being converted.
+            converter_properties = context.scene.rigify_converter
+            converter_properties.included_actions.clear()
+            action_property = converter_properties.included_actions.add()
+            action_property.action = action
+            action_property.frame_range_start = combined_frame_range[0]
+            action_property.frame_range_end = combined_frame_range[1]
+
+            with profiler.section("converter"):
+                run_converter(context, assigned_rig_object, mesh_to_convert, rig_root_name)
+
+def rig_depends_on_other_objects(rig_object):
+    # Tells whether the pose of the rig can depend on other objects, through its parent, constraints or drivers.
+    # The baked pose of a rig that does not can only depend on its own action.
+    if rig_object.parent != None:
+        return True
+    for animation_data in (rig_object.animation_data, rig_object.data.animation_data):
+        if animation_data != None and len(animation_data.drivers) > 0:
+            return True
+    constraints = list(rig_object.constraints)
+    for pose_bone in rig_object.pose.bones:
+        constraints.extend(pose_bone.constraints)
+    for constraint in constraints:
+        targets = [getattr(constraint, "target", None)]
+        targets.extend(x.target for x in getattr(constraint, "targets", ()))
+        if any(x != None and x != rig_object for x in targets):
+            return True
+    return False
+
+def get_bake_job_key(context, action_group, action_assignment, frame_range, group_actions):
+    # Key of everything the bake of a single rig in the group depends on, so that bakes with the same key give the same result.
+    rig_object = action_assignment.assigned_rig_object
+    # A rig that can depend on other objects is only the same bake if all the rigs of the group have the same actions.
+    dependencies = group_actions if rig_depends_on_other_objects(rig_object) else ()
+    return (
+        rig_object.name_full,
+        action_assignment.action.name_full,
+        tuple(frame_range),
+        get_conversion_root_bone_name(context, rig_object),
+        action_group.use_keyframe_reduction,
+        action_group.location_tolerance,
+        action_group.rotation_tolerance,
+        action_group.scale_tolerance,
+        action_group.remove_constant_channels,
+        dependencies,
+    )
+
+def plan_conversion(context, group_indices):
+    # Plans the conversion of the groups. Returns the group indices in the order that swaps the fewest actions on the rigs,
+    # and {group index: {rig name: index of an earlier group}} for the rigs whose bake an earlier group already made.
+    # A bake can only be reused if the earlier group was converted successfully and its results stay in the file.
+    # Only bakes of the built-in bake engine are reused, since the objects and actions the converter creates can not be told apart.
+    properties = context.scene.action_organizer
+    group_assignments = []
+    for index in group_indices:
+        action_group = properties.action_groups[index]
+        assignments = {
+            x.assigned_rig_object.name_full: x.action.name_full
+            for x in action_group.action_assignments if x.action != None and x.assigned_rig_object != None
+        }
+        group_assignments.append((index, assignments))
+    ordered_indices = conversion_planner.order_groups(group_assignments)
+
+    if properties.bake_engine != "NATIVE" or properties.export_format != "NONE" or properties.results_directory != "":
+        return ordered_indices, {}
+
+    assignments_by_index = dict(group_assignments)
+    group_jobs = []
+    for index in ordered_indices:
+        action_group = properties.action_groups[index]
+        # Groups that can not be converted are left out, and fail with a proper message when they are converted.
+        try:
+            if get_action_group_problems(context, action_group):
+                continue
+            frame_range = get_combined_frame_range(action_group)
+            group_actions = tuple(sorted(assignments_by_index[index].items()))
+            jobs = [
+                (x.assigned_rig_object.name_full, get_bake_job_key(context, action_group, x, frame_range, group_actions))
+                for x in action_group.action_assignments if x.action != None
+            ]
+        except ConversionError:
+            continue
+        group_jobs.append((index, jobs))
+    return ordered_indices, conversion_planner.find_reused_jobs(group_jobs)
+
+def describe_conversion_error(error):
+    # Conversion errors explain themselves. Anything else is unexpected, so its type is kept in the message.
+    if isinstance(error, ConversionError):
+        return str(error)
+    return f"{type(error).__name__}: {error}"
+
+def load_conversion_journal(context, resume):
+    # Returns the journal of the conversion run, or None if no journal path has been set.
+    # Unless resuming, the journal starts out empty, replacing the journal of an earlier run.
+    journal_path = context.scene.action_organizer.journal_path
+    if journal_path == "":
+        return None
+    journal_path = bpy.path.abspath(journal_path)
+    if resume:
+        return journal.ConversionJournal.load(journal_path)
+    return journal.ConversionJournal(journal_path)
+
+def get_addon_version():
+    return ".".join(str(x) for x in sys.modules[__package__].bl_info["version"])
+
+def create_profiler(context):
+    properties = context.scene.action_organizer
+    return profiling.BakeProfiler({
+        "addon_version": get_addon_version(),
+        "blender_version": bpy.app.version_string,
+        "bake_engine": properties.bake_engine,
+        "file": bpy.data.filepath,
+    })
+
+def report_profiler(operator, context, profiler):
+    # Shows the timing summary in the info editor and writes the timing log if one has been set.
+    profiler.finish()
+    for line in profiler.summary_lines():
+        operator.report({"INFO"}, line)
+
+    timing_log_path = context.scene.action_organizer.timing_log_path
+    if timing_log_path != "":
+        try:
+            profiler.write_log(bpy.path.abspath(timing_log_path))
+        except OSError as e:
+            operator.report({"WARNING"}, f"Could not write timing log: {e}")
+
+def report_keyframe_reduction(operator, results):
+    keys_before = sum(x.keys_before_reduction for x in results)
+    keys_after = sum(x.keys_after_reduction for x in results)
+    if keys_before > 0:
+        operator.report({"INFO"}, f"Reduced baked keyframes from {keys_before} to {keys_after} ({100.0 * keys_after / keys_before:.1f}%)")
 
 #
 # UI classes.
@@ -30,6 +734,58 @@ class ACTION_ORGANIZER_UL_ActionGroup(bpy.types.UIList):
             row.alignment = "LEFT"
             row.label(text=item.name, icon_value=icon)
 
+    def filter_items(self, context, data, propname):
+        action_groups = getattr(data, propname)
+        helper = bpy.types.UI_UL_list
+
+        flags = []
+        if self.filter_name:
+            # Inverting the filter is left to filter_items once it is overridden.
+            flags = helper.filter_items_by_name(self.filter_name, self.bitflag_filter_item, action_groups, "name", reverse=self.use_filter_invert)
+
+        order = []
+        if self.use_filter_sort_alpha:
+            order = helper.sort_items_by_name(action_groups, "name")
+
+        return flags, order
+
+class ACTION_ORGANIZER_UL_ActionAssignment(bpy.types.UIList):
+    # Only the rows that are scrolled into view are drawn, which keeps the editor responsive with large groups.
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        if self.layout_type in {"DEFAULT", "COMPACT"}:
+            row = layout.row(align=True)
+
+            # Button to select action and its assigned object.
+            select_action_operator = row.operator(SelectActionAssignmentOperator.bl_idname, text="", icon="RESTRICT_SELECT_OFF")
+            select_action_operator.action_assignment_index = index
+
+            # Selection boxes for action and rig object.
+            row.prop(item, "action", text="")
+            row.prop(item, "assigned_rig_object", text="")
+        elif self.layout_type == "GRID":
+            layout.alignment = "CENTER"
+            layout.label(text=item.action.name if item.action != None else "", icon="ACTION")
+
+    def filter_items(self, context, data, propname):
+        # Filters and sorts by the names of both the action and the rig, since either one can be what is being looked for.
+        action_assignments = getattr(data, propname)
+        names = [
+            f"{x.action.name if x.action != None else ''} {x.assigned_rig_object.name if x.assigned_rig_object != None else ''}"
+            for x in action_assignments
+        ]
+
+        flags = []
+        if self.filter_name:
+            pattern = f"*{self.filter_name.lower()}*"
+            flags = [self.bitflag_filter_item if fnmatch.fnmatchcase(x.lower(), pattern) != self.use_filter_invert else 0 for x in names]
+
+        order = []
+        if self.use_filter_sort_alpha:
+            order = bpy.types.UI_UL_list.sort_items_helper(list(enumerate(x.lower() for x in names)), lambda x: x[1])
+
+        return flags, order
+
 #
 # Properties.
 #
@@ -56,9 +812,72 @@ class ActionAssignmentProperty(bpy.types.PropertyGroup):
 class ActionGroupProperty(bpy.types.PropertyGroup):
     name: bpy.props.StringProperty()
     action_assignments: bpy.props.CollectionProperty(type=ActionAssignmentProperty)
+    active_action_assignment_index: bpy.props.IntProperty()
+    frame_range_source: bpy.props.EnumProperty(
+        name="Frame range",
+        description="What the baked frame range of the group is taken from",
+        items=[
+            ("ACTION", "Action frame range", "Use the frame range of each action"),
+            ("KEYFRAMES", "Keyframes", "Use the range of the keyframes in each action"),
+        ],
+        default="ACTION",
+    )
+    ignore_muted_fcurves: bpy.props.BoolProperty(
+        name="Ignore muted F-curves",
+        description="Leave keyframes of muted F-curves out of the frame range",
+        default=True,
+    )
+    ignore_hidden_fcurves: bpy.props.BoolProperty(
+        name="Ignore hidden F-curves",
+        description="Leave keyframes of hidden F-curves out of the frame range",
+        default=False,
+    )
+    use_manual_frame_ranges: bpy.props.BoolProperty(
+        name="Use manual frame ranges",
+        description="Use the manual frame range of actions that have one instead of their keyframes",
+        default=True,
+    )
+    use_keyframe_reduction: bpy.props.BoolProperty(
+        name="Reduce keyframes",
+        description="Remove baked keyframes that can be recreated by interpolating between the remaining ones",
+        default=False,
+    )
+    location_tolerance: bpy.props.FloatProperty(
+        name="Location tolerance",
+        description="Largest allowed difference to the baked location when removing keyframes",
+        default=0.0001,
+        min=0.0,
+        precision=5,
+    )
+    rotation_tolerance: bpy.props.FloatProperty(
+        name="Rotation tolerance",
+        description="Largest allowed difference to the baked rotation values when removing keyframes",
+        default=0.0001,
+        min=0.0,
+        precision=5,
+    )
+    scale_tolerance: bpy.props.FloatProperty(
+        name="Scale tolerance",
+        description="Largest allowed difference to the baked scale when removing keyframes",
+        default=0.0001,
+        min=0.0,
+        precision=5,
+    )
+    remove_constant_channels: bpy.props.BoolProperty(
+        name="Remove constant channels",
+        description="Remove channels that stay at their default value for the whole bake",
+        default=True,
+    )
+    last_bake_fingerprint: bpy.props.StringProperty(
+        description="Fingerprint of the actions and settings the group was last successfully converted with",
+        options={"HIDDEN"},
+    )
+
+def update_rig_object(self, context):
+    invalidate_rig_conversion_index()
 
 class RigConversionProperty(bpy.types.PropertyGroup):
-    rig_object: bpy.props.PointerProperty(type=bpy.types.Object, poll=poll_rig_object)
+    rig_object: bpy.props.PointerProperty(type=bpy.types.Object, poll=poll_rig_object, update=update_rig_object)
     rig_root_name: bpy.props.StringProperty(default="root")
     mesh_object: bpy.props.PointerProperty(type=bpy.types.Object, poll=poll_mesh_object)
 
@@ -66,6 +885,82 @@ class ActionOrganizerProperties(bpy.types.PropertyGroup):
     action_groups: bpy.props.CollectionProperty(type=ActionGroupProperty)
     active_action_group_index: bpy.props.IntProperty()
     rig_conversion_properties: bpy.props.CollectionProperty(type=RigConversionProperty)
+    bake_engine: bpy.props.EnumProperty(
+        name="Bake engine",
+        description="What the action groups are converted with",
+        items=[
+            ("RIGIFY_CONVERTER", "Rigify converter", "Convert each rig and its mesh with the rigify converter addon"),
+            ("NATIVE", "Built-in", "Bake the pose of all rigs in a group in a single pass over the frame range"),
+        ],
+        default="RIGIFY_CONVERTER",
+    )
+    bake_only_deform_bones: bpy.props.BoolProperty(
+        name="Only deform bones",
+        description="Only bake deforming bones and the root bone when using the built-in bake engine",
+        default=True,
+    )
+    baked_action_suffix: bpy.props.StringProperty(
+        name="Baked action suffix",
+        description="Added to the names of the actions the built-in bake engine bakes into, which are named after the action group and rig",
+        default="_baked",
+    )
+    action_name_pattern: bpy.props.StringProperty(
+        name="Action name pattern",
+        description="How action names are made of the names of their action group and rig, with {group} and {rig} in place of the names",
+        default="{group}_{rig}",
+    )
+    export_format: bpy.props.EnumProperty(
+        name="Export",
+        description="File format to export each action group to right after it has been converted",
+        items=[
+            ("NONE", "None", "Do not export converted action groups"),
+            ("FBX", "FBX", "Export each converted action group to an FBX file"),
+            ("GLTF", "glTF", "Export each converted action group to a binary glTF file"),
+        ],
+        default="NONE",
+    )
+    export_directory: bpy.props.StringProperty(
+        name="Export directory",
+        description="Directory to export converted action groups to, one file per group named after the group",
+        subtype="DIR_PATH",
+        default="//",
+    )
+    free_after_export: bpy.props.BoolProperty(
+        name="Remove after export",
+        description="Remove the baked actions and converted objects once they have been exported, so that they do not use memory for the rest of the conversion",
+        default=True,
+    )
+    results_directory: bpy.props.StringProperty(
+        name="Results directory",
+        description="Move the datablocks each converted group creates to a .blend library named after the group in this directory, instead of keeping them in the open file",
+        subtype="DIR_PATH",
+    )
+    remove_conversion_orphans: bpy.props.BoolProperty(
+        name="Remove leftover data",
+        description="Remove datablocks that a conversion created but left without users, such as temporary meshes and materials",
+        default=True,
+    )
+    journal_path: bpy.props.StringProperty(
+        name="Journal",
+        description="File to record the result of each converted action group in, so that an interrupted or partly failed run can be resumed",
+        subtype="FILE_PATH",
+    )
+    memory_limit: bpy.props.IntProperty(
+        name="Memory limit (MB)",
+        description="Stop converting when Blender uses more memory than this. 0 means no limit. Only works where the memory use can be read from /proc, such as on Linux",
+        default=0,
+        min=0,
+    )
+    timing_log_path: bpy.props.StringProperty(
+        name="Timing log",
+        description="File to write the timing of each conversion to. Written as CSV if the name ends with .csv and as JSON otherwise",
+        subtype="FILE_PATH",
+    )
+    use_context_override: bpy.props.BoolProperty(
+        name="Convert without selecting",
+        description="Pass the objects being converted to the converter through a context override instead of selecting them. Turn off if the converter does not pick up the objects",
+        default=True,
+    )
 
 #
 # Operators.
@@ -120,6 +1015,7 @@ class CreateActionAssignmentOperator(bpy.types.Operator):
         index = properties.active_action_group_index
         action_group = properties.action_groups[index]
         action_group.action_assignments.add()
+        action_group.active_action_assignment_index = len(action_group.action_assignments) - 1
         return {"FINISHED"}
     
 class RemoveActionAssignmentOperator(bpy.types.Operator):
@@ -139,7 +1035,12 @@ class RemoveActionAssignmentOperator(bpy.types.Operator):
         properties = context.scene.action_organizer
         group_index = properties.active_action_group_index
         action_group = properties.action_groups[group_index]
-        action_group.action_assignments.remove(self.action_assignment_index)
+        index = self.action_assignment_index
+        if index < 0 or index >= len(action_group.action_assignments):
+            return {"CANCELLED"}
+        action_group.action_assignments.remove(index)
+        if action_group.active_action_assignment_index >= index:
+            action_group.active_action_assignment_index = max(0, action_group.active_action_assignment_index - 1)
         return {"FINISHED"}
     
 class SelectActionAssignmentOperator(bpy.types.Operator):
@@ -161,30 +1062,189 @@ class SelectActionAssignmentOperator(bpy.types.Operator):
 
         action_group = properties.action_groups[group_index]
 
-        if not context.mode == "OBJECT":
+        # Switching modes is only needed when a different rig has to be made active.
+        # Pose mode has to be exited first, since the active object can not be changed properly in it.
+        selected_rig_object = None
+        if self.action_assignment_index >= 0 and self.action_assignment_index < len(action_group.action_assignments):
+            selected_rig_object = action_group.action_assignments[self.action_assignment_index].assigned_rig_object
+        change_mode = not (context.mode == "POSE" and selected_rig_object == context.view_layer.objects.active)
+
+        if change_mode and not context.mode == "OBJECT":
             bpy.ops.object.mode_set(mode="OBJECT")
-        
-        for i, action_assignment in enumerate(action_group.action_assignments):
-            action = action_assignment.action
-            assigned_rig_object = action_assignment.assigned_rig_object
 
-            # Set action.
-            if action != None:
-                if assigned_rig_object.animation_data == None:
-                    assigned_rig_object.animation_data_create()
-                assigned_rig_object.animation_data.action = action
+        assign_action_group_actions(action_group)
 
-            # Select the rig.
-            if i == self.action_assignment_index and assigned_rig_object != None:
-                bpy.ops.object.select_all(action="DESELECT")
-                assigned_rig_object.select_set(True)
-                context.view_layer.objects.active = assigned_rig_object
+        # Select the rig.
+        if selected_rig_object != None:
+            deselect_all_objects(context)
+            selected_rig_object.select_set(True)
+            context.view_layer.objects.active = selected_rig_object
 
         # Set mode to pose mode.
-        bpy.ops.object.mode_set(mode="POSE")
+        if change_mode:
+            bpy.ops.object.mode_set(mode="POSE")
 
         return {"FINISHED"}
     
+class ActivateActionGroupOperator(bpy.types.Operator):
+    bl_idname = "action_organizer.activate_action_group"
+    bl_label = "Activate action group"
+    bl_description = "Make an action group active and assign its actions to their rigs without changing the selection or mode"
+    bl_options = {"REGISTER", "UNDO"}
+
+    offset: bpy.props.IntProperty(
+        name="Offset",
+        description="Activate the group this many places after the active group, wrapping around at the ends of the list",
+        default=0,
+    )
+
+    @classmethod
+    def poll(self, context):
+        properties = context.scene.action_organizer
+        return len(properties.action_groups) > 0
+
+    def execute(self, context):
+        properties = context.scene.action_organizer
+        group_count = len(properties.action_groups)
+        index = min(max(properties.active_action_group_index, 0), group_count - 1)
+        index = (index + self.offset) % group_count
+        properties.active_action_group_index = index
+
+        # Only the actions are changed, so the scene is evaluated once for the whole group on the next redraw
+        # and the undo step stays small.
+        assign_action_group_actions(properties.action_groups[index])
+        return {"FINISHED"}
+
+class PopulateActionGroupsOperator(bpy.types.Operator):
+    bl_idname = "action_organizer.populate_action_groups"
+    bl_label = "Action groups from names"
+    bl_description = "Create and fill action groups by matching the names of all actions against the action name pattern"
+    bl_options = {"REGISTER", "UNDO"}
+
+    create_groups: bpy.props.BoolProperty(
+        name="Create groups",
+        description="Create action groups for group names that do not have one yet",
+        default=True,
+    )
+    replace_actions: bpy.props.BoolProperty(
+        name="Replace actions",
+        description="Replace the action of rigs that already have an action in the group",
+        default=False,
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        properties = context.scene.action_organizer
+        layout = self.layout
+        layout.prop(properties, "action_name_pattern")
+        layout.prop(self, "create_groups")
+        layout.prop(self, "replace_actions")
+
+    def execute(self, context):
+        properties = context.scene.action_organizer
+        rig_objects = {x.name: x for x in context.scene.objects if x.type == "ARMATURE"}
+        try:
+            expression = name_patterns.compile_action_name_pattern(properties.action_name_pattern, rig_objects.keys())
+        except ValueError as e:
+            self.report({"ERROR"}, str(e))
+            return {"CANCELLED"}
+
+        # Actions made by the built-in bake engine would otherwise be matched as actions of their own.
+        suffix = properties.baked_action_suffix
+        actions = (x for x in bpy.data.actions if not (suffix and x.name.endswith(suffix)))
+        matches = name_patterns.match_action_names(actions, expression)
+
+        # Items are looked up by index, since adding to a collection can move its existing items in memory.
+        group_indices = {x.name: i for i, x in enumerate(properties.action_groups)}
+        created_count = 0
+        added_count = 0
+        replaced_count = 0
+        for group_name in sorted(matches):
+            group_index = group_indices.get(group_name)
+            if group_index == None:
+                if not self.create_groups:
+                    continue
+                properties.action_groups.add().name = group_name
+                group_index = len(properties.action_groups) - 1
+                group_indices[group_name] = group_index
+                created_count += 1
+
+            action_assignments = properties.action_groups[group_index].action_assignments
+            assignment_indices = {x.assigned_rig_object.name: i for i, x in enumerate(action_assignments) if x.assigned_rig_object != None}
+            for rig_name, action in sorted(matches[group_name].items()):
+                assignment_index = assignment_indices.get(rig_name)
+                if assignment_index == None:
+                    action_assignment = action_assignments.add()
+                    action_assignment.assigned_rig_object = rig_objects[rig_name]
+                    action_assignment.action = action
+                    added_count += 1
+                elif self.replace_actions and action_assignments[assignment_index].action != action:
+                    action_assignments[assignment_index].action = action
+                    replaced_count += 1
+
+        invalidate_action_group_problems()
+        self.report({"INFO"}, f"Created {created_count} action group(s), added {added_count} and replaced {replaced_count} action(s)")
+        return {"FINISHED"}
+
+class ExportActionGroupsOperator(bpy.types.Operator):
+    bl_idname = "action_organizer.export_action_groups"
+    bl_label = "Export action groups"
+    bl_description = "Write the action groups and rig conversion settings to a JSON manifest that refers to actions and objects by name"
+    bl_options = {"REGISTER"}
+
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+    filter_glob: bpy.props.StringProperty(default="*.json", options={"HIDDEN"})
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = f"{os.path.splitext(bpy.path.basename(bpy.data.filepath))[0] or 'action_groups'}.json"
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+
+    def execute(self, context):
+        properties = context.scene.action_organizer
+        path = bpy.path.ensure_ext(bpy.path.abspath(self.filepath), ".json")
+        try:
+            manifest.write_manifest(path, manifest.export_manifest(properties))
+        except OSError as e:
+            self.report({"ERROR"}, str(e))
+            return {"CANCELLED"}
+        self.report({"INFO"}, f"Exported {len(properties.action_groups)} action group(s) to {path}")
+        return {"FINISHED"}
+
+class ImportActionGroupsOperator(bpy.types.Operator):
+    bl_idname = "action_organizer.import_action_groups"
+    bl_label = "Import action groups"
+    bl_description = "Create or update action groups and rig conversion settings from a JSON manifest"
+    bl_options = {"REGISTER", "UNDO"}
+
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+    filter_glob: bpy.props.StringProperty(default="*.json", options={"HIDDEN"})
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+
+    def execute(self, context):
+        properties = context.scene.action_organizer
+        try:
+            values = manifest.read_manifest(bpy.path.abspath(self.filepath))
+            missing_names = manifest.import_manifest(properties, values, bpy.data.actions, context.scene.objects)
+        except (OSError, ValueError, KeyError) as e:
+            self.report({"ERROR"}, str(e))
+            return {"CANCELLED"}
+        finally:
+            invalidate_rig_conversion_index()
+            invalidate_action_group_problems()
+
+        if missing_names:
+            self.report({"WARNING"}, f"Could not find {len(missing_names)} action(s) or object(s): {', '.join(sorted(set(missing_names)))}")
+        else:
+            self.report({"INFO"}, f"Imported {len(values.get('action_groups', []))} action group(s)")
+        return {"FINISHED"}
+
 class ActiveActionGroupSelectorOperator(bpy.types.Operator):
     bl_idname = "action_organizer.active_action_group_selector"
     bl_label = "Select active action group"
@@ -216,6 +1276,11 @@ class ActiveActionGroupSelectorOperator(bpy.types.Operator):
         right_column = main_row.column(align=True)
         right_column.operator(CreateActionGroupOperator.bl_idname, text="", icon="ADD")
         right_column.operator(RemoveActionGroupOperator.bl_idname, text="", icon="REMOVE")
+        right_column.separator()
+        right_column.operator(PopulateActionGroupsOperator.bl_idname, text="", icon="SORTALPHA")
+        right_column.separator()
+        right_column.operator(ImportActionGroupsOperator.bl_idname, text="", icon="IMPORT")
+        right_column.operator(ExportActionGroupsOperator.bl_idname, text="", icon="EXPORT")
 
 class ActionGroupEditorOperator(bpy.types.Operator):
     bl_idname = "action_organizer.action_group_editor"
@@ -243,24 +1308,74 @@ class ActionGroupEditorOperator(bpy.types.Operator):
         group_index = properties.active_action_group_index
         active_group = properties.action_groups[group_index]
 
-        for action_assignment_index, action_assignment in enumerate(active_group.action_assignments):
-            action_data_row = layout.row()
+        # Frame range settings of the group.
+        frame_range_row = layout.row()
+        frame_range_row.prop(active_group, "frame_range_source")
+        if active_group.frame_range_source == "KEYFRAMES":
+            frame_range_options_row = layout.row()
+            frame_range_options_row.prop(active_group, "use_manual_frame_ranges")
+            frame_range_options_row.prop(active_group, "ignore_muted_fcurves")
+            frame_range_options_row.prop(active_group, "ignore_hidden_fcurves")
+
+        # Keyframe reduction settings of the group.
+        reduction_row = layout.row()
+        reduction_row.prop(active_group, "use_keyframe_reduction")
+        if active_group.use_keyframe_reduction:
+            reduction_row.prop(active_group, "remove_constant_channels")
+            tolerance_row = layout.row()
+            tolerance_row.prop(active_group, "location_tolerance")
+            tolerance_row.prop(active_group, "rotation_tolerance")
+            tolerance_row.prop(active_group, "scale_tolerance")
+
+        assignments_row = layout.row()
+        assignments_row.template_list(
+            listtype_name="ACTION_ORGANIZER_UL_ActionAssignment",
+            list_id="",
+            dataptr=active_group,
+            propname="action_assignments",
+            active_dataptr=active_group,
+            active_propname="active_action_assignment_index",
+            type="DEFAULT",
+            rows=8,
+        )
 
-            # Button to select action and its assigned object.
-            select_action_operator = action_data_row.operator(SelectActionAssignmentOperator.bl_idname, text="Select")
-            select_action_operator.action_assignment_index = action_assignment_index
+        # Buttons to create a new action assignment and to remove the active one.
+        right_column = assignments_row.column(align=True)
+        right_column.operator(CreateActionAssignmentOperator.bl_idname, text="", icon="ADD")
+        remove_action_operator = right_column.operator(RemoveActionAssignmentOperator.bl_idname, text="", icon="REMOVE")
+        remove_action_operator.action_assignment_index = active_group.active_action_assignment_index
 
-            # Selection boxes for action and rig object.
-            action_data_row.prop_search(action_assignment, "action", bpy.data, "actions", text="")
-            action_data_row.prop_search(action_assignment, "assigned_rig_object", context.scene, "objects", text="")
+        validate_row = layout.row()
+        validate_row.operator(ValidateActionGroupOperator.bl_idname, icon="CHECKMARK")
+
+class ValidateActionGroupOperator(bpy.types.Operator):
+    bl_idname = "action_organizer.validate_action_group"
+    bl_label = "Validate group"
+    bl_description = "Check the active action group for everything that would prevent it from being converted"
+    bl_options = {"REGISTER"}
 
-            # Button to remove action assigment.
-            remove_action_operator = action_data_row.operator(RemoveActionAssignmentOperator.bl_idname, text="", icon="REMOVE")
-            remove_action_operator.action_assignment_index = action_assignment_index
+    @classmethod
+    def poll(self, context):
+        properties = context.scene.action_organizer
+        return active_group_index_is_valid(properties)
 
-        # Button to create a new action assigment.
-        create_action_row = layout.row()
-        create_action_row.operator(CreateActionAssignmentOperator.bl_idname, icon="ADD")
+    def execute(self, context):
+        properties = context.scene.action_organizer
+        action_group = properties.action_groups[properties.active_action_group_index]
+
+        problems = get_action_group_problems(context, action_group)
+        action_group_problems_cache[action_group.as_pointer()] = (get_action_group_signature(action_group), problems)
+
+        if not bake_engine_is_available(context):
+            problems = ["Can not convert action groups if action converter addon is not enabled"] + problems
+
+        for problem in problems:
+            self.report({"WARNING"}, problem)
+        if problems:
+            self.report({"WARNING"}, f"Action group \"{action_group.name}\" has {len(problems)} problem(s)")
+        else:
+            self.report({"INFO"}, f"Action group \"{action_group.name}\" can be converted")
+        return {"FINISHED"}
 
 class ConvertActionGroupOperator(bpy.types.Operator):
     bl_idname = "action_organizer.convert_action_groups"
@@ -270,8 +1385,8 @@ class ConvertActionGroupOperator(bpy.types.Operator):
 
     @classmethod
     def poll(self, context):
-        # This operator depends on the rigify converter addon being enabled.
-        if not hasattr(bpy.ops.rigify_converter, "convert"):
+        # Unless the built-in bake engine is used, this operator depends on the rigify converter addon being enabled.
+        if not bake_engine_is_available(context):
             self.poll_message_set(f"Can not convert action groups if action converter addon is not enabled")
             return False
         
@@ -283,85 +1398,25 @@ class ConvertActionGroupOperator(bpy.types.Operator):
             self.poll_message_set(f"Active group index is invalid. Group index: {index}, total groups: {group_count}")
             return False
     
-        action_group = properties.action_groups[index]
-        for action_assignment in action_group.action_assignments:
-            rig_object = action_assignment.assigned_rig_object
-
-            # Check that root bones exist in the armature.
-            rig_root_name = get_conversion_root_bone_name(context, rig_object)
-            if rig_root_name not in rig_object.data.bones:
-                self.poll_message_set(f"Root bone \"{rig_root_name}\" could not be found in armature \"{rig_object.name}\"")
-                return False
-            
-            # Check that conversion meshes exist as a child of the armature.
-            mesh_to_convert = get_conversion_mesh(context, rig_object)
-            if mesh_to_convert == None:
-                self.poll_message_set(f"No mesh has been assigned to be converted with armature \"{rig_object.name}\"")
-                return False
-            if mesh_to_convert not in rig_object.children:
-                self.poll_message_set(f"Mesh \"{mesh_to_convert.name}\" could not be found in the children of armature \"{rig_object.name}\"")
-                return False
+        problems = get_cached_action_group_problems(context, properties.action_groups[index])
+        if problems:
+            self.poll_message_set(problems[0])
+            return False
 
         return True
 
     def execute(self, context):
         properties = context.scene.action_organizer
         action_group = properties.action_groups[properties.active_action_group_index]
-        
-        if not context.mode == "OBJECT":
-            bpy.ops.object.mode_set(mode="OBJECT")
-
-        # Set animation data for all rigs in the group.
-        # This ensures that animations on different rigs that rely on each other bake correcly, which is basically the whole point of this addon.
-        for action_assignment in action_group.action_assignments:
-            assigned_rig_object = action_assignment.assigned_rig_object
-            action = action_assignment.action
-            if action != None:
-                if assigned_rig_object.animation_data == None:
-                    assigned_rig_object.animation_data_create()
-                assigned_rig_object.animation_data.action = action
-
-        # Calculate the combined frame range from the beginning of the earliest action to the end of the latest action.
-        combined_frame_range = (float("inf"), float("-inf"))
-        for action_assignment in action_group.action_assignments:
-            action = action_assignment.action
-            frame_range = (math.floor(action.frame_range[0]), math.ceil(action.frame_range[1]))
-            combined_frame_range = (
-                min(combined_frame_range[0], frame_range[0]),
-                max(combined_frame_range[1], frame_range[1]),
-            )
-        # Make frame range at least 2 frames long.
-        combined_frame_range = (
-            combined_frame_range[0],
-            combined_frame_range[1] + 1 if combined_frame_range[0] == combined_frame_range[1] else combined_frame_range[1]
-        )
-            
-        for action_assignment in action_group.action_assignments:
-            assigned_rig_object = action_assignment.assigned_rig_object
-            action = action_assignment.action
-
-            # Select the rig object that is being converted.
-            bpy.ops.object.select_all(action="DESELECT")
-            assigned_rig_object.select_set(True)
-            context.view_layer.objects.active = assigned_rig_object
-
-            # Select the mesh object that is being converted.
-            mesh_to_convert = get_conversion_mesh(context, action_assignment.assigned_rig_object)
-            mesh_to_convert.select_set(True)
-
-            # Get the root bone used in the conversion.
-            rig_root_name = get_conversion_root_bone_name(context, action_assignment.assigned_rig_object)
-
-            # Set the action that is being converted.
-            converter_properties = context.scene.rigify_converter
-            converter_properties.included_actions.clear()
-            action_property = converter_properties.included_actions.add()
-            action_property.action = action
-            action_property.frame_range_start = combined_frame_range[0]
-            action_property.frame_range_end = combined_frame_range[1]
-
-            bpy.ops.rigify_converter.convert(add_as_root_bone=rig_root_name)
-
+        report_unchecked_memory_limit(self, context)
+        profiler = create_profiler(context)
+        try:
+            result = convert_action_group(context, action_group, profiler=profiler)
+        except ConversionError as e:
+            self.report({"ERROR"}, str(e))
+            return {"CANCELLED"}
+        report_keyframe_reduction(self, [result])
+        report_profiler(self, context, profiler)
         return {"FINISHED"}
     
     def invoke(self, context, event):
@@ -380,8 +1435,14 @@ class ConvertActionGroupOperator(bpy.types.Operator):
         bone_label_column.alignment = "RIGHT"
         bone_property_column = row.column()
         for action_assignment in action_group.action_assignments:
-            bone_label_column.label(text=action_assignment.assigned_rig_object.name)
-            bone_property_column.prop(action_assignment, "rig_root_name", text="")
+            rig_object = action_assignment.assigned_rig_object
+            if rig_object == None:
+                continue
+            bone_label_column.label(text=rig_object.name)
+            try:
+                bone_property_column.prop(get_rig_conversion_property(context, rig_object), "rig_root_name", text="")
+            except ConversionError:
+                bone_property_column.label(text="No conversion settings")
 
 class ConvertAllActionGroupsOperator(bpy.types.Operator):
     bl_idname = "action_organizer.convert_all_action_groups"
@@ -389,10 +1450,21 @@ class ConvertAllActionGroupsOperator(bpy.types.Operator):
     bl_description = "Convert all action groups"
     bl_options = {"REGISTER"}
 
+    only_changed: bpy.props.BoolProperty(
+        name="Only changed groups",
+        description="Skip groups whose actions and conversion settings have not changed since they were last converted",
+        default=False,
+    )
+    resume: bpy.props.BoolProperty(
+        name="Resume",
+        description="Skip the groups that the journal has as converted and that have not changed since",
+        default=False,
+    )
+
     @classmethod
     def poll(self, context):
-        # This operator depends on the rigify converter addon being enabled.
-        if not hasattr(bpy.ops.rigify_converter, "convert"):
+        # Unless the built-in bake engine is used, this operator depends on the rigify converter addon being enabled.
+        if not bake_engine_is_available(context):
             return False
         
         # Check that there is at least one action group.
@@ -400,46 +1472,197 @@ class ConvertAllActionGroupsOperator(bpy.types.Operator):
         return len(properties.action_groups) > 0
 
     def execute(self, context):
+        if not self.start_run(context):
+            return {"CANCELLED"}
+        if not self.queue:
+            return self.finish_run(context)
+
+        # With a window to report progress in, one group is converted on each timer tick so that the interface gets redrawn in between.
+        # In the background there is nothing to redraw, so everything is converted at once.
+        if context.window != None and not bpy.app.background:
+            window_manager = context.window_manager
+            window_manager.progress_begin(0, max(len(self.queue), 1))
+            self.timer = window_manager.event_timer_add(0.01, window=context.window)
+            window_manager.modal_handler_add(self)
+            self.update_status(context)
+            return {"RUNNING_MODAL"}
+
+        while self.queue:
+            self.convert_next_group(context)
+        return self.finish_run(context)
+
+    def modal(self, context, event):
+        if event.type == "ESC":
+            self.cancelled = True
+            return self.finish_run(context)
+        if event.type == "TIMER":
+            if self.queue:
+                self.convert_next_group(context)
+            if not self.queue:
+                return self.finish_run(context)
+            self.update_status(context)
+        # Other input is blocked while converting, since changing the scene in between groups could break the conversion.
+        return {"RUNNING_MODAL"}
+
+    def cancel(self, context):
+        # Called when Blender ends the run itself, e.g. when the window is closed.
+        self.cancelled = True
+        self.finish_run(context)
+
+    def start_run(self, context):
+        # Works out which groups are converted and sets up the state of the run. Returns False if the run can not be started.
         properties = context.scene.action_organizer
+        try:
+            self.conversion_journal = load_conversion_journal(context, self.resume)
+        except (OSError, ValueError) as e:
+            self.report({"ERROR"}, f"Could not read conversion journal: {e}")
+            return False
+        report_unchecked_memory_limit(self, context)
 
+        self.queue = []
+        self.skipped_count = 0
         for i, action_group in enumerate(properties.action_groups):
-            properties.active_action_group_index = i
-            bpy.ops.action_organizer.convert_action_groups()
-        
+            if self.only_changed and not action_group_has_changed(context, action_group):
+                self.skipped_count += 1
+                continue
+            if self.conversion_journal != None and self.resume:
+                try:
+                    if self.conversion_journal.is_converted(action_group.name, compute_action_group_fingerprint(context, action_group)):
+                        self.skipped_count += 1
+                        continue
+                except ConversionError:
+                    # Groups that can not be fingerprinted fail in the conversion with a better message.
+                    pass
+            self.queue.append(i)
+        self.queue, self.reused_jobs = plan_conversion(context, self.queue)
+
+        # Frame counts of the groups for estimating the remaining time. Groups whose frame range can not be read are left out.
+        self.remaining_frames = {}
+        for i in self.queue:
+            try:
+                frame_range = get_combined_frame_range(properties.action_groups[i])
+                self.remaining_frames[i] = int(frame_range[1] - frame_range[0]) + 1
+            except ConversionError:
+                pass
+
+        self.group_count = len(self.queue)
+        self.results = []
+        self.errors = []
+        self.converted_indices = set()
+        self.cancelled = False
+        self.timer = None
+        self.profiler = create_profiler(context)
+        self.exit_stack = contextlib.ExitStack()
+        self.exit_stack.enter_context(preserved_selection(context))
+        return True
+
+    def convert_next_group(self, context):
+        properties = context.scene.action_organizer
+        i = self.queue.pop(0)
+        action_group = properties.action_groups[i]
+        properties.active_action_group_index = i
+        self.remaining_frames.pop(i, None)
+
+        # A failing group is recorded and the run goes on, so that one broken group does not cost the whole run.
+        # Bakes of earlier groups can only be reused if those groups were converted.
+        reused_rigs = {
+            rig_name: properties.action_groups[earlier_index]
+            for rig_name, earlier_index in self.reused_jobs.get(i, {}).items() if earlier_index in self.converted_indices
+        }
+        error = None
+        try:
+            self.results.append(convert_action_group(context, action_group, restore_selection=False, profiler=self.profiler, reused_rigs=reused_rigs))
+        except Exception as e:
+            error = describe_conversion_error(e)
+            self.errors.append(error)
+        else:
+            self.converted_indices.add(i)
+
+        if self.conversion_journal != None:
+            try:
+                if error == None:
+                    self.conversion_journal.record(action_group.name, "converted", fingerprint=action_group.last_bake_fingerprint)
+                else:
+                    self.conversion_journal.record(action_group.name, "failed", error=error)
+            except OSError as e:
+                self.report({"WARNING"}, f"Could not write conversion journal: {e}")
+
+    def get_remaining_seconds(self):
+        # Estimates the remaining time from the frames per second of the groups converted so far, or None until there is something to measure.
+        converted_frames = sum(x.frames for x in self.profiler.groups)
+        converted_seconds = sum(x.seconds for x in self.profiler.groups)
+        if converted_frames == 0 or converted_seconds <= 0.0:
+            return None
+        return sum(self.remaining_frames.values()) * converted_seconds / converted_frames
+
+    def update_status(self, context):
+        done_count = self.group_count - len(self.queue)
+        context.window_manager.progress_update(done_count)
+
+        text = f"Converting action groups: {done_count}/{self.group_count}"
+        if self.queue:
+            text += f", next \"{context.scene.action_organizer.action_groups[self.queue[0]].name}\""
+        remaining_seconds = self.get_remaining_seconds()
+        if remaining_seconds != None:
+            minutes, seconds = divmod(int(remaining_seconds), 60)
+            text += f", about {minutes}:{seconds:02d} left"
+        text += " (Esc to cancel)"
+        context.workspace.status_text_set(text)
+
+    def finish_run(self, context):
+        self.exit_stack.close()
+        if self.timer != None:
+            window_manager = context.window_manager
+            window_manager.event_timer_remove(self.timer)
+            window_manager.progress_end()
+            context.workspace.status_text_set(None)
+            self.timer = None
+
+        if self.cancelled:
+            self.report({"WARNING"}, f"Cancelled, {len(self.queue)} action group(s) were not converted")
+        if self.skipped_count > 0:
+            self.report({"INFO"}, f"Skipped {self.skipped_count} unchanged or already converted action group(s)")
+        reused_count = sum(len(x.reused_rigs) for x in self.results)
+        if reused_count > 0:
+            self.report({"INFO"}, f"Reused {reused_count} bake(s) made by earlier action groups")
+        report_keyframe_reduction(self, self.results)
+        report_profiler(self, context, self.profiler)
+
+        for error in self.errors:
+            self.report({"ERROR"}, error)
+        if self.errors:
+            self.report({"WARNING"}, f"Converted {len(self.results)} action group(s), {len(self.errors)} failed")
+        if self.cancelled or (self.errors and not self.results):
+            return {"CANCELLED"}
         return {"FINISHED"}
     
     def invoke(self, context, event):
-        properties = context.scene.action_organizer
-
-        group = properties.action_groups[properties.active_action_group_index]
-
-        # Avoid clearing valid properties.
-        saved_properties = {}
-        assignment_rigs = [x.assigned_rig_object for x in group.action_assignments if x.assigned_rig_object]
-        for property in properties.rig_conversion_properties:
-            if property.rig_object != None and property.rig_object in assignment_rigs:
-                saved_properties[property.rig_object.name] = {
-                    "rig_root_name": property.rig_root_name,
-                    "mesh_object": property.mesh_object,
-                }
-
-        # Clear and add rig conversion properties.
-        properties.rig_conversion_properties.clear()
-        for rig_object in (x.assigned_rig_object for x in group.action_assignments if x.assigned_rig_object != None):
-            new_property = properties.rig_conversion_properties.add()
-            new_property.rig_object = rig_object
-            try:
-                new_property.rig_root_name = saved_properties[rig_object.name]["rig_root_name"]
-                new_property.mesh_object = saved_properties[rig_object.name]["mesh_object"]
-            except:
-                pass
-        
+        add_missing_rig_conversion_properties(context)
         return context.window_manager.invoke_props_dialog(self)
     
     def draw(self, context):
         properties = context.scene.action_organizer
         layout = self.layout
 
+        layout.prop(self, "only_changed")
+        layout.prop(properties, "journal_path")
+        if properties.journal_path != "":
+            layout.prop(self, "resume")
+        layout.prop(properties, "bake_engine")
+        if properties.bake_engine == "NATIVE":
+            layout.prop(properties, "bake_only_deform_bones")
+            layout.prop(properties, "baked_action_suffix")
+        else:
+            layout.prop(properties, "use_context_override")
+        layout.prop(properties, "export_format")
+        if properties.export_format != "NONE":
+            layout.prop(properties, "export_directory")
+            layout.prop(properties, "free_after_export")
+        layout.prop(properties, "results_directory")
+        layout.prop(properties, "remove_conversion_orphans")
+        layout.prop(properties, "memory_limit")
+        layout.prop(properties, "timing_log_path")
+
         # Label.
         box = layout.box()
         box.label(text="Root bones")
@@ -469,8 +1692,10 @@ def menu_function(self, context):
     row = layout.row(align=True)
 
     # Button for selecting action group.
-    row.ui_units_x = 10
+    row.ui_units_x = 12
     row.operator(ActiveActionGroupSelectorOperator.bl_idname, text="", icon="DOWNARROW_HLT")
+    row.operator(ActivateActionGroupOperator.bl_idname, text="", icon="TRIA_LEFT").offset = -1
+    row.operator(ActivateActionGroupOperator.bl_idname, text="", icon="TRIA_RIGHT").offset = 1
 
     split = row.split(factor=0.6, align=True)
 
@@ -487,6 +1712,7 @@ def menu_function(self, context):
 
 classes = (
     ACTION_ORGANIZER_UL_ActionGroup,
+    ACTION_ORGANIZER_UL_ActionAssignment,
     ActionAssignmentProperty,
     ActionGroupProperty,
     RigConversionProperty,
@@ -496,20 +1722,80 @@ classes = (
     CreateActionAssignmentOperator,
     RemoveActionAssignmentOperator,
     SelectActionAssignmentOperator,
+    ActivateActionGroupOperator,
+    PopulateActionGroupsOperator,
+    ExportActionGroupsOperator,
+    ImportActionGroupsOperator,
     ActiveActionGroupSelectorOperator,
     ActionGroupEditorOperator,
+    ValidateActionGroupOperator,
     ConvertActionGroupOperator,
     ConvertAllActionGroupsOperator,
 )
 
+@bpy.app.handlers.persistent
+def cache_invalidation_handler(*args):
+    invalidate_rig_conversion_index()
+    invalidate_action_group_problems()
+
+@bpy.app.handlers.persistent
+def depsgraph_update_handler(scene, depsgraph):
+    # Bones, parenting and conversion settings live in armatures, objects and the scene, while edits to actions can not affect validation.
+    for update in depsgraph.updates:
+        if isinstance(update.id, (bpy.types.Object, bpy.types.Armature, bpy.types.Scene)):
+            invalidate_action_group_problems()
+            return
+
+cache_invalidation_handlers = (
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post,
+    bpy.app.handlers.load_post,
+)
+
+# Hotkeys for stepping to the next and previous action group, in the editors where animations are reviewed.
+# Each entry is (keymap name, space type). The keymap items are kept so that they can be removed on unregister.
+keymap_definitions = (
+    ("Dopesheet", "DOPESHEET_EDITOR"),
+    ("Pose", "EMPTY"),
+    ("Object Mode", "EMPTY"),
+)
+keymap_items = []
+
+def register_keymaps():
+    key_config = bpy.context.window_manager.keyconfigs.addon
+    # There is no add-on key configuration in background mode.
+    if key_config == None:
+        return
+    for keymap_name, space_type in keymap_definitions:
+        keymap = key_config.keymaps.new(name=keymap_name, space_type=space_type)
+        for key_type, offset in (("PAGE_DOWN", 1), ("PAGE_UP", -1)):
+            keymap_item = keymap.keymap_items.new(ActivateActionGroupOperator.bl_idname, key_type, "PRESS", ctrl=True, alt=True)
+            keymap_item.properties.offset = offset
+            keymap_items.append((keymap, keymap_item))
+
+def unregister_keymaps():
+    for keymap, keymap_item in keymap_items:
+        keymap.keymap_items.remove(keymap_item)
+    keymap_items.clear()
+
 def register():
     for c in classes:
         bpy.utils.register_class(c)
     bpy.types.Scene.action_organizer = bpy.props.PointerProperty(type=ActionOrganizerProperties)
     bpy.types.DOPESHEET_HT_header.append(menu_function)
+    register_keymaps()
+    for handlers in cache_invalidation_handlers:
+        handlers.append(cache_invalidation_handler)
+    bpy.app.handlers.depsgraph_update_post.append(depsgraph_update_handler)
 
 def unregister():
+    unregister_keymaps()
+    bpy.app.handlers.depsgraph_update_post.remove(depsgraph_update_handler)
+    for handlers in cache_invalidation_handlers:
+        handlers.remove(cache_invalidation_handler)
     for c in classes:
         bpy.utils.unregister_class(c)
     del bpy.types.Scene.action_organizer
     bpy.types.DOPESHEET_HT_header.remove(menu_function)
+    invalidate_rig_conversion_index()
+    invalidate_action_group_problems()
@@ -0,0 +1,208 @@
+import bpy
+import numpy as np
+
+from .fcurve_utils import write_fcurve
+
+# Built-in alternative to the rigify converter. Instead of evaluating the scene over the frame range once for each rig,
+# the scene is stepped through the frame range once and the poses of all rigs in the group are sampled on each frame.
+
+def read_matrices(collection, attribute):
+    # Reads a 4x4 matrix attribute of every item in the collection with a single foreach_get.
+    # Blender stores matrices column by column, so they are transposed to the usual row by row layout.
+    values = np.empty(len(collection) * 16, dtype=np.float32)
+    collection.foreach_get(attribute, values)
+    return values.reshape(-1, 4, 4).transpose(0, 2, 1)
+
+def matrices_to_quaternions(matrices):
+    # Converts an array of 3x3 rotation matrices to (w, x, y, z) quaternions, picking the numerically stable formula for each matrix.
+    m = matrices
+    trace = m[..., 0, 0] + m[..., 1, 1] + m[..., 2, 2]
+    quaternions = np.empty(m.shape[:-2] + (4,), dtype=m.dtype)
+    choice = np.argmax(np.stack([trace, m[..., 0, 0], m[..., 1, 1], m[..., 2, 2]], axis=-1), axis=-1)
+
+    mask = choice == 0
+    s = np.sqrt(np.maximum(trace[mask] + 1.0, 1e-12)) * 2.0
+    quaternions[mask] = np.stack([
+        0.25 * s,
+        (m[mask][:, 2, 1] - m[mask][:, 1, 2]) / s,
+        (m[mask][:, 0, 2] - m[mask][:, 2, 0]) / s,
+        (m[mask][:, 1, 0] - m[mask][:, 0, 1]) / s,
+    ], axis=-1)
+
+    mask = choice == 1
+    n = m[mask]
+    s = np.sqrt(np.maximum(1.0 + n[:, 0, 0] - n[:, 1, 1] - n[:, 2, 2], 1e-12)) * 2.0
+    quaternions[mask] = np.stack([
+        (n[:, 2, 1] - n[:, 1, 2]) / s,
+        0.25 * s,
+        (n[:, 0, 1] + n[:, 1, 0]) / s,
+        (n[:, 0, 2] + n[:, 2, 0]) / s,
+    ], axis=-1)
+
+    mask = choice == 2
+    n = m[mask]
+    s = np.sqrt(np.maximum(1.0 + n[:, 1, 1] - n[:, 0, 0] - n[:, 2, 2], 1e-12)) * 2.0
+    quaternions[mask] = np.stack([
+        (n[:, 0, 2] - n[:, 2, 0]) / s,
+        (n[:, 0, 1] + n[:, 1, 0]) / s,
+        0.25 * s,
+        (n[:, 1, 2] + n[:, 2, 1]) / s,
+    ], axis=-1)
+
+    mask = choice == 3
+    n = m[mask]
+    s = np.sqrt(np.maximum(1.0 + n[:, 2, 2] - n[:, 0, 0] - n[:, 1, 1], 1e-12)) * 2.0
+    quaternions[mask] = np.stack([
+        (n[:, 1, 0] - n[:, 0, 1]) / s,
+        (n[:, 0, 2] + n[:, 2, 0]) / s,
+        (n[:, 1, 2] + n[:, 2, 1]) / s,
+        0.25 * s,
+    ], axis=-1)
+
+    return quaternions
+
+def make_quaternions_continuous(quaternions):
+    # q and -q are the same rotation, so flip signs along the first axis (time) to avoid interpolating the long way around.
+    dots = np.sum(quaternions[1:] * quaternions[:-1], axis=-1)
+    signs = np.where(dots < 0.0, -1.0, 1.0)
+    signs = np.concatenate([np.ones((1,) + signs.shape[1:]), np.cumprod(signs, axis=0)], axis=0)
+    return quaternions * signs[..., None]
+
+class RigSampler:
+    # Collects the pose of the chosen bones of one rig on every frame of the bake.
+
+    def __init__(self, rig_object, bone_names, frame_count):
+        self.rig_object = rig_object
+        pose_bones = rig_object.pose.bones
+        self.bone_indices = [i for i, x in enumerate(pose_bones) if x.name in bone_names]
+        self.buffer = np.empty(len(pose_bones) * 16, dtype=np.float32)
+        self.pose_matrices = np.empty((frame_count, len(pose_bones), 4, 4), dtype=np.float32)
+
+        # Bones that do not fully inherit the transform of their parent can not be handled by the matrix math below,
+        # so their local matrices are asked from Blender on each frame instead.
+        self.converted_bone_indices = [
+            i for i in self.bone_indices
+            if pose_bones[i].parent != None and (pose_bones[i].bone.inherit_scale != "FULL" or not pose_bones[i].bone.use_inherit_rotation)
+        ]
+        self.converted_matrices = np.empty((frame_count, len(self.converted_bone_indices), 4, 4), dtype=np.float32)
+
+    def sample(self, frame_index):
+        pose_bones = self.rig_object.pose.bones
+        pose_bones.foreach_get("matrix", self.buffer)
+        self.pose_matrices[frame_index] = self.buffer.reshape(-1, 4, 4).transpose(0, 2, 1)
+
+        for i, bone_index in enumerate(self.converted_bone_indices):
+            pose_bone = pose_bones[bone_index]
+            local_matrix = self.rig_object.convert_space(pose_bone=pose_bone, matrix=pose_bone.matrix, from_space="POSE", to_space="LOCAL")
+            self.converted_matrices[frame_index, i] = np.array(local_matrix, dtype=np.float32)
+
+    def compute_local_matrices(self):
+        # Undoes the parent and rest transforms from the sampled pose space matrices, giving the matrix_basis of each bone on each frame.
+        # pose = parent_pose @ parent_rest^-1 @ rest @ basis, so basis = rest^-1 @ parent_rest @ parent_pose^-1 @ pose.
+        rig_object = self.rig_object
+        bones = rig_object.data.bones
+        rest_matrices = read_matrices(bones, "matrix_local").astype(np.float64)
+        pose_matrices = self.pose_matrices.astype(np.float64)
+
+        # Pose bones and bones are in the same order.
+        parent_indices = np.array([bones.find(x.parent.name) if x.parent != None else -1 for x in bones], dtype=np.int64)
+        has_parent = parent_indices >= 0
+
+        inverse_rest_matrices = np.linalg.inv(rest_matrices)
+        rest_offsets = inverse_rest_matrices.copy()
+        rest_offsets[has_parent] = inverse_rest_matrices[has_parent] @ rest_matrices[parent_indices[has_parent]]
+
+        parent_pose_matrices = np.broadcast_to(np.identity(4), pose_matrices.shape).copy()
+        parent_pose_matrices[:, has_parent] = pose_matrices[:, parent_indices[has_parent]]
+
+        local_matrices = rest_offsets[None] @ np.linalg.inv(parent_pose_matrices) @ pose_matrices
+        for i, bone_index in enumerate(self.converted_bone_indices):
+            local_matrices[:, bone_index] = self.converted_matrices[:, i]
+        return local_matrices[:, self.bone_indices]
+
+    def write_action(self, action, frames):
+        # Writes the sampled poses as one linearly interpolated keyframe per frame for every channel of the chosen bones.
+        local_matrices = self.compute_local_matrices()
+        locations = local_matrices[..., :3, 3]
+        rotation_scale = local_matrices[..., :3, :3]
+        scales = np.linalg.norm(rotation_scale, axis=-2)
+        # A mirrored matrix can not be expressed as a rotation, so move the mirroring to the scale.
+        mirrored = np.linalg.det(rotation_scale) < 0.0
+        scales[..., 0] = np.where(mirrored, -scales[..., 0], scales[..., 0])
+        safe_scales = np.where(np.abs(scales) < 1e-12, 1e-12, scales)
+        rotations = rotation_scale / safe_scales[..., None, :]
+        quaternions = make_quaternions_continuous(matrices_to_quaternions(rotations))
+
+        pose_bones = self.rig_object.pose.bones
+        for i, bone_index in enumerate(self.bone_indices):
+            pose_bone = pose_bones[bone_index]
+            bone_path = pose_bone.path_from_id()
+            group_name = pose_bone.name
+
+            for axis in range(3):
+                write_fcurve(action.fcurves, f"{bone_path}.location", axis, group_name, frames, locations[:, i, axis])
+
+            if pose_bone.rotation_mode == "QUATERNION":
+                for axis in range(4):
+                    write_fcurve(action.fcurves, f"{bone_path}.rotation_quaternion", axis, group_name, frames, quaternions[:, i, axis])
+            else:
+                # Euler and axis angle rotations are converted one key at a time, which keeps the eulers compatible with the previous key.
+                rotation_values = rotations_from_quaternions(quaternions[:, i], pose_bone.rotation_mode)
+                data_path = "rotation_axis_angle" if pose_bone.rotation_mode == "AXIS_ANGLE" else "rotation_euler"
+                for axis in range(rotation_values.shape[1]):
+                    write_fcurve(action.fcurves, f"{bone_path}.{data_path}", axis, group_name, frames, rotation_values[:, axis])
+
+            for axis in range(3):
+                write_fcurve(action.fcurves, f"{bone_path}.scale", axis, group_name, frames, scales[:, i, axis])
+
+def rotations_from_quaternions(quaternions, rotation_mode):
+    from mathutils import Quaternion
+
+    values = []
+    previous_euler = None
+    for quaternion in quaternions:
+        quaternion = Quaternion(quaternion)
+        if rotation_mode == "AXIS_ANGLE":
+            axis, angle = quaternion.to_axis_angle()
+            values.append((angle, axis[0], axis[1], axis[2]))
+        else:
+            euler = quaternion.to_euler(rotation_mode, previous_euler) if previous_euler != None else quaternion.to_euler(rotation_mode)
+            values.append(tuple(euler))
+            previous_euler = euler
+    return np.array(values, dtype=np.float64)
+
+def get_baked_action(name):
+    # Reuses the action from an earlier bake so that re-baking does not leave numbered copies behind.
+    action = bpy.data.actions.get(name)
+    if action == None:
+        action = bpy.data.actions.new(name)
+    else:
+        action.fcurves.clear()
+    action.use_fake_user = True
+    return action
+
+def bake_rigs(context, bake_jobs, frame_range, profiler):
+    # Bakes the visual pose of each rig over the frame range into a new action.
+    # bake_jobs is a list of (rig object, names of bones to bake, name of the baked action). Returns the baked actions.
+    scene = context.scene
+    frames = np.arange(frame_range[0], frame_range[1] + 1, dtype=np.float32)
+    samplers = [RigSampler(rig_object, set(bone_names), len(frames)) for rig_object, bone_names, action_name in bake_jobs]
+
+    original_frame = (scene.frame_current, scene.frame_subframe)
+    try:
+        # Evaluating the scene and sampling the rigs happen in the same loop and can not be told apart without slowing the loop down.
+        with profiler.section("evaluate_and_sample"):
+            for frame_index, frame in enumerate(frames):
+                scene.frame_set(int(frame))
+                for sampler in samplers:
+                    sampler.sample(frame_index)
+    finally:
+        scene.frame_set(original_frame[0], subframe=original_frame[1])
+
+    baked_actions = []
+    for sampler, (rig_object, bone_names, action_name) in zip(samplers, bake_jobs):
+        with profiler.rig(rig_object.name), profiler.section("write_fcurves"):
+            action = get_baked_action(action_name)
+            sampler.write_action(action, frames)
+        baked_actions.append(action)
+    return baked_actions
@@ -0,0 +1,432 @@
+"""Convert action groups without the user interface.
+
+Usage:
+    blender -b file.blend --python batch_convert.py -- [--groups NAME ...] [--workers N] [--summary PATH] [--save]
+    blender -b file.blend --python-expr "import sys, action_organizer.batch_convert as b; sys.exit(b.main())" -- --groups NAME
+
+The process exits with one of the EXIT_* codes below and can write a JSON summary of the run.
+
+With --workers, the groups are split into shards that are converted by background Blender processes
+running this same script on a copy of the file. Each worker writes the actions it created to a side
+file, and the main process appends them back into the opened file.
+"""
+
+import bpy
+import argparse
+import importlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+EXIT_SUCCESS = 0
+EXIT_CONVERSION_FAILED = 1
+EXIT_USAGE_ERROR = 2
+EXIT_CONVERTER_MISSING = 3
+
+def script_arguments():
+    # Blender passes everything after "--" to the script untouched.
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+    return []
+
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(
+        prog="batch_convert",
+        description="Convert action groups of the opened .blend file in the background.",
+    )
+    parser.add_argument("--groups", nargs="+", metavar="NAME", help="Names of the action groups to convert. All groups are converted by default.")
+    parser.add_argument("--group-indices", nargs="+", type=int, metavar="INDEX", help=argparse.SUPPRESS)
+    parser.add_argument("--changed-only", action="store_true", help="Skip groups that have not changed since they were last converted.")
+    parser.add_argument("--journal", metavar="PATH", help="Record the result of each group in a journal at PATH. Defaults to the journal set in the file.")
+    parser.add_argument("--resume", action="store_true", help="Skip the groups that the journal has as converted and that have not changed since.")
+    parser.add_argument("--workers", type=int, default=1, metavar="N", help="Number of background Blender processes to convert groups in. 0 uses one per CPU core.")
+    parser.add_argument("--write-results", metavar="PATH", help=argparse.SUPPRESS)
+    parser.add_argument("--export", choices=["FBX", "GLTF"], help="Export each group to a file of its own right after converting it.")
+    parser.add_argument("--export-directory", metavar="PATH", help="Directory to export the groups to. Defaults to the export directory set in the file.")
+    parser.add_argument("--results-directory", metavar="PATH", help="Move the datablocks each group creates to a .blend library in PATH instead of keeping them in the file.")
+    parser.add_argument("--memory-limit", type=int, metavar="MB", help="Stop converting groups once Blender uses more than MB megabytes of memory.")
+    parser.add_argument("--import-manifest", metavar="PATH", help="Create or update action groups from a JSON manifest before converting.")
+    parser.add_argument("--export-manifest", metavar="PATH", help="Write the action groups to a JSON manifest and exit.")
+    parser.add_argument("--list", action="store_true", help="Print the action groups of the file and exit.")
+    parser.add_argument("--summary", metavar="PATH", help="Write a JSON summary of the run to PATH, or to stdout if PATH is \"-\".")
+    parser.add_argument("--timing-log", metavar="PATH", help="Write the timing of each group to PATH, as CSV if it ends with .csv and as JSON otherwise.")
+    parser.add_argument("--save", action="store_true", help="Save the file after converting.")
+    parser.add_argument("--save-as", metavar="PATH", help="Save the converted file to PATH instead of overwriting the opened file.")
+    return parser.parse_args(argv)
+
+def load_addon():
+    # Returns the addon package, registering the addon first if it has not been enabled in this Blender instance.
+    if __package__:
+        package = importlib.import_module(__package__)
+    else:
+        # Running as a plain script, so find the package this file belongs to.
+        addon_directory = os.path.dirname(os.path.abspath(__file__))
+        init_path = os.path.join(addon_directory, "__init__.py")
+        package = next((m for m in list(sys.modules.values()) if getattr(m, "__file__", None) == init_path), None)
+        if package == None:
+            sys.path.insert(0, os.path.dirname(addon_directory))
+            package = importlib.import_module(os.path.basename(addon_directory))
+
+    if not hasattr(bpy.types.Scene, "action_organizer"):
+        package.register()
+
+    return package
+
+def resolve_group_indices(properties, group_names):
+    # Returns indices of the named groups in the order they were given, or all indices if no names were given.
+    if not group_names:
+        return list(range(len(properties.action_groups)))
+
+    indices = []
+    for name in group_names:
+        index = properties.action_groups.find(name)
+        if index < 0:
+            raise ValueError(f"Action group \"{name}\" does not exist")
+        indices.append(index)
+    return indices
+
+def record_in_journal(conversion_journal, result):
+    if conversion_journal == None:
+        return
+    try:
+        conversion_journal.record(result["name"], result["status"], fingerprint=result.get("fingerprint"), error=result["error"])
+    except OSError as e:
+        print(f"batch_convert: could not write conversion journal: {e}", file=sys.stderr)
+
+def convert_groups(context, package, group_indices, profiler, conversion_journal=None):
+    # Converts groups one by one and keeps going after a group fails so that one broken group does not cost the whole run.
+    # Returns a result for each group and the actions created by the successful conversions.
+    # The result of each group is recorded in the journal as soon as the group is done.
+    operator_module = package.action_organizer_operator
+
+    properties = context.scene.action_organizer
+    results = []
+    created_actions = []
+    group_indices, reused_jobs = operator_module.plan_conversion(context, group_indices)
+    converted_indices = set()
+    with operator_module.preserved_selection(context):
+        for index in group_indices:
+            action_group = properties.action_groups[index]
+            reused_rigs = {
+                rig_name: properties.action_groups[earlier_index]
+                for rig_name, earlier_index in reused_jobs.get(index, {}).items() if earlier_index in converted_indices
+            }
+            result = {
+                "index": index,
+                "name": action_group.name,
+                "status": "converted",
+                "error": None,
+                "actions": [],
+            }
+            start_time = time.perf_counter()
+            try:
+                conversion_result = operator_module.convert_action_group(context, action_group, restore_selection=False, profiler=profiler, reused_rigs=reused_rigs)
+            except Exception as e:
+                result["status"] = "failed"
+                result["error"] = operator_module.describe_conversion_error(e)
+            else:
+                converted_indices.add(index)
+                result["actions"] = [x.name for x in conversion_result.baked_actions]
+                if conversion_result.reused_rigs:
+                    result["reused_rigs"] = [x.name for x in conversion_result.reused_rigs]
+                if conversion_result.export_path != None:
+                    result["export"] = conversion_result.export_path
+                if conversion_result.library_path != None:
+                    result["library"] = conversion_result.library_path
+                if conversion_result.resident_memory != None:
+                    result["memory_mb"] = round(conversion_result.resident_memory / (1024 * 1024), 1)
+                result["fingerprint"] = action_group.last_bake_fingerprint
+                result["timing"] = conversion_result.timing.as_dict()
+                if action_group.use_keyframe_reduction:
+                    result["keys_before_reduction"] = conversion_result.keys_before_reduction
+                    result["keys_after_reduction"] = conversion_result.keys_after_reduction
+                created_actions.extend(conversion_result.baked_actions)
+            result["seconds"] = round(time.perf_counter() - start_time, 3)
+            results.append(result)
+            record_in_journal(conversion_journal, result)
+    return results, created_actions
+
+def split_into_shards(group_indices, worker_count):
+    # Deals the groups out round robin so that neighbouring groups, which tend to be of similar size, end up in different shards.
+    shards = [group_indices[i::worker_count] for i in range(worker_count)]
+    return [x for x in shards if x]
+
+def convert_groups_in_workers(package, group_indices, worker_count, profiler, has_changes=False, conversion_journal=None):
+    # Converts the groups in separate Blender processes and appends the actions they created into the current file.
+    # Only this process writes the journal, recording the groups of each worker when the worker finishes.
+    # has_changes tells that the file has been changed in ways that do not mark it dirty, such as from this script.
+    work_directory = tempfile.mkdtemp(prefix="action_organizer_")
+    try:
+        # Workers open the file from disk, so unsaved changes have to be written to a copy first.
+        source_path = bpy.data.filepath
+        if source_path == "" or bpy.data.is_dirty or has_changes:
+            source_path = os.path.join(work_directory, "source.blend")
+            bpy.ops.wm.save_as_mainfile(filepath=source_path, copy=True)
+
+        workers = []
+        for worker_index, shard in enumerate(split_into_shards(group_indices, worker_count)):
+            results_path = os.path.join(work_directory, f"worker_{worker_index}.blend")
+            summary_path = os.path.join(work_directory, f"worker_{worker_index}.json")
+            log_path = os.path.join(work_directory, f"worker_{worker_index}.log")
+            command = [
+                bpy.app.binary_path, "--background", source_path,
+                "--python", os.path.abspath(__file__),
+                "--",
+                "--group-indices", *(str(x) for x in shard),
+                "--write-results", results_path,
+                "--summary", summary_path,
+            ]
+            with open(log_path, "w", encoding="utf-8") as log_file:
+                process = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT)
+            workers.append((shard, process, results_path, summary_path, log_path))
+
+        results = []
+        for shard, process, results_path, summary_path, log_path in workers:
+            return_code = process.wait()
+            if return_code not in (EXIT_SUCCESS, EXIT_CONVERSION_FAILED) or not os.path.exists(summary_path):
+                with open(log_path, encoding="utf-8", errors="replace") as log_file:
+                    sys.stderr.write(log_file.read())
+                properties = bpy.context.scene.action_organizer
+                for index in shard:
+                    result = {
+                        "index": index,
+                        "name": properties.action_groups[index].name,
+                        "status": "failed",
+                        "error": f"Worker process exited with code {return_code}",
+                        "actions": [],
+                    }
+                    results.append(result)
+                    record_in_journal(conversion_journal, result)
+                continue
+
+            with open(summary_path, encoding="utf-8") as summary_file:
+                worker_results = json.load(summary_file)["groups"]
+            merge_worker_results(results_path, worker_results)
+            results.extend(worker_results)
+            for result in worker_results:
+                record_in_journal(conversion_journal, result)
+
+        # Workers recorded the fingerprints in their copies of the file, so copy them over for --changed-only to work on later runs.
+        # Timings of the groups are also only known by the workers.
+        properties = bpy.context.scene.action_organizer
+        profiling = package.action_organizer_operator.profiling
+        for result in results:
+            if result["status"] == "converted":
+                properties.action_groups[result["index"]].last_bake_fingerprint = result["fingerprint"]
+                profiler.groups.append(profiling.GroupTiming.from_dict(result["timing"]))
+
+        results.sort(key=lambda x: group_indices.index(x["index"]))
+        return results
+    finally:
+        shutil.rmtree(work_directory, ignore_errors=True)
+
+def merge_worker_results(results_path, worker_results):
+    # Appends the actions of converted groups from a worker's side file and updates the results with their names in this file.
+    action_names = {name for x in worker_results if x["status"] == "converted" for name in x["actions"]}
+    if not action_names:
+        return
+
+    with bpy.data.libraries.load(results_path, link=False) as (data_from, data_to):
+        data_to.actions = [x for x in data_from.actions if x in action_names]
+
+    # Re-baking can overwrite actions that already exist in this file, in which case the appended action replaces the old one.
+    # Otherwise the appended action keeps the name it got, since appending renames datablocks whose names are already taken.
+    appended_names = {}
+    for source_name, action in zip((x for x in data_from.actions if x in action_names), data_to.actions):
+        if action == None:
+            continue
+        action.use_fake_user = True
+        existing_action = bpy.data.actions.get(source_name)
+        if existing_action != None and existing_action != action:
+            existing_action.user_remap(action)
+            bpy.data.actions.remove(existing_action)
+            action.name = source_name
+        appended_names[source_name] = action.name
+
+    for result in worker_results:
+        result["actions"] = [appended_names[x] for x in result["actions"] if x in appended_names]
+
+def write_summary(summary, path):
+    text = json.dumps(summary, indent=2)
+    if path == "-":
+        print(text)
+    else:
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+def main(argv=None):
+    if argv == None:
+        argv = script_arguments()
+
+    try:
+        args = parse_arguments(argv)
+    except SystemExit as e:
+        # argparse exits on its own for --help and bad arguments.
+        return EXIT_SUCCESS if e.code == 0 else EXIT_USAGE_ERROR
+
+    context = bpy.context
+    package = load_addon()
+    operator_module = package.action_organizer_operator
+    properties = context.scene.action_organizer
+
+    if args.import_manifest:
+        try:
+            missing_names = operator_module.manifest.import_manifest(
+                properties, operator_module.manifest.read_manifest(args.import_manifest), bpy.data.actions, context.scene.objects
+            )
+        except (OSError, ValueError, KeyError) as e:
+            print(f"batch_convert: {args.import_manifest}: {e}", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+        finally:
+            operator_module.invalidate_rig_conversion_index()
+            operator_module.invalidate_action_group_problems()
+        for name in sorted(set(missing_names)):
+            print(f"batch_convert: {args.import_manifest}: no action or object called \"{name}\"", file=sys.stderr)
+
+    if args.export_manifest:
+        operator_module.manifest.write_manifest(args.export_manifest, operator_module.manifest.export_manifest(properties))
+        return EXIT_SUCCESS
+
+    if args.list:
+        for i, action_group in enumerate(properties.action_groups):
+            print(f"{i}\t{action_group.name}")
+        return EXIT_SUCCESS
+
+    try:
+        if args.group_indices != None:
+            group_indices = args.group_indices
+        else:
+            group_indices = resolve_group_indices(properties, args.groups)
+    except ValueError as e:
+        print(f"batch_convert: {e}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+
+    worker_count = args.workers if args.workers > 0 else os.cpu_count() or 1
+
+    if args.export:
+        properties.export_format = args.export
+    if args.export_directory:
+        properties.export_directory = os.path.abspath(args.export_directory)
+    elif properties.export_format != "NONE":
+        # Workers may open a copy of the file from another directory, where a relative export directory would point somewhere else.
+        properties.export_directory = bpy.path.abspath(properties.export_directory)
+    if args.results_directory:
+        properties.results_directory = os.path.abspath(args.results_directory)
+    elif properties.results_directory != "":
+        properties.results_directory = bpy.path.abspath(properties.results_directory)
+    if args.memory_limit != None:
+        properties.memory_limit = args.memory_limit
+    if not operator_module.memory_limit_can_be_checked(context):
+        # A limit asked for on the command line is an error, while one saved in the file may come from a machine where it works.
+        if args.memory_limit != None:
+            print("batch_convert: --memory-limit needs /proc/self/statm to read the memory use, which this system does not have", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+        print("batch_convert: the memory limit of the file is ignored, since the memory use can not be read on this system", file=sys.stderr)
+
+    if not operator_module.bake_engine_is_available(context):
+        print("batch_convert: the rigify converter addon is not enabled", file=sys.stderr)
+        return EXIT_CONVERTER_MISSING
+
+    journal_path = args.journal or bpy.path.abspath(properties.journal_path)
+    conversion_journal = None
+    # Workers leave the journal to the main process.
+    if journal_path and not args.write_results:
+        try:
+            if args.resume:
+                conversion_journal = operator_module.journal.ConversionJournal.load(journal_path)
+            else:
+                conversion_journal = operator_module.journal.ConversionJournal(journal_path)
+        except (OSError, ValueError) as e:
+            print(f"batch_convert: could not read conversion journal: {e}", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+    elif args.resume:
+        print("batch_convert: --resume needs a journal", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+
+    skipped_results = []
+    if args.resume:
+        converted_indices = []
+        for index in group_indices:
+            action_group = properties.action_groups[index]
+            try:
+                group_fingerprint = operator_module.compute_action_group_fingerprint(context, action_group)
+            except operator_module.ConversionError:
+                continue
+            if conversion_journal.is_converted(action_group.name, group_fingerprint):
+                converted_indices.append(index)
+        for index in converted_indices:
+            skipped_results.append({
+                "index": index,
+                "name": properties.action_groups[index].name,
+                "status": "skipped",
+                "error": None,
+                "actions": [],
+            })
+        group_indices = [x for x in group_indices if x not in converted_indices]
+
+    if args.changed_only:
+        unchanged_indices = [x for x in group_indices if not operator_module.action_group_has_changed(context, properties.action_groups[x])]
+        for index in unchanged_indices:
+            skipped_results.append({
+                "index": index,
+                "name": properties.action_groups[index].name,
+                "status": "skipped",
+                "error": None,
+                "actions": [],
+            })
+        group_indices = [x for x in group_indices if x not in unchanged_indices]
+
+    profiler = operator_module.create_profiler(context)
+    original_group_index = properties.active_action_group_index
+    if worker_count > 1 and len(group_indices) > 1:
+        has_changes = bool(args.import_manifest or args.memory_limit != None) or properties.export_format != "NONE" or properties.results_directory != ""
+        results = convert_groups_in_workers(
+            package, group_indices, min(worker_count, len(group_indices)), profiler,
+            has_changes=has_changes, conversion_journal=conversion_journal,
+        )
+    else:
+        results, created_actions = convert_groups(context, package, group_indices, profiler, conversion_journal)
+        if args.write_results:
+            bpy.data.libraries.write(os.path.abspath(args.write_results), set(created_actions), fake_user=True)
+    properties.active_action_group_index = original_group_index
+    results = sorted(skipped_results + results, key=lambda x: x["index"])
+    profiler.finish()
+
+    failed_count = sum(1 for x in results if x["status"] == "failed")
+    summary = {
+        "file": bpy.data.filepath,
+        "blender_version": bpy.app.version_string,
+        "seconds": round(profiler.seconds, 3),
+        "converted": sum(1 for x in results if x["status"] == "converted"),
+        "skipped": len(skipped_results),
+        "failed": failed_count,
+        "groups": results,
+    }
+
+    if args.save_as:
+        bpy.ops.wm.save_as_mainfile(filepath=os.path.abspath(args.save_as))
+    elif args.save:
+        bpy.ops.wm.save_mainfile()
+
+    if args.summary:
+        write_summary(summary, args.summary)
+
+    # Workers leave the timing log to the main process, which collects the timings of every worker.
+    timing_log_path = args.timing_log or bpy.path.abspath(properties.timing_log_path)
+    if timing_log_path and not args.write_results:
+        profiler.write_log(timing_log_path)
+    for line in profiler.summary_lines():
+        print(f"batch_convert: {line}")
+
+    for result in results:
+        if result["status"] == "failed":
+            print(f"batch_convert: {result['name']}: {result['error']}", file=sys.stderr)
+
+    return EXIT_CONVERSION_FAILED if failed_count > 0 else EXIT_SUCCESS
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+"""Measure how the addon scales with the size of the scene.
+
+Usage:
+    blender -b --factory-startup --python benchmark.py -- [--armatures N] [--bones N] [--groups N] [--keyframes N]
+        [--extra-actions N] [--list-assignments N] [--scales 1 2 4] [--repeat N] [--output PATH] [--compare PATH [--max-slowdown RATIO]]
+
+Every run starts from an empty file and generates armatures, actions and action groups procedurally, so results
+of runs with the same arguments can be compared between addon and Blender versions. With --scales, the number
+of armatures, groups, extra actions and list assignments is multiplied by each scale in turn to show how the timings grow.
+With --compare, the process exits with code 1 if any timing is more than --max-slowdown times the earlier one.
+"""
+
+import bpy
+import argparse
+import importlib
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+if __package__:
+    from . import batch_convert
+else:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import batch_convert
+
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(prog="benchmark", description="Benchmark the action organizer addon on generated scenes.")
+    parser.add_argument("--armatures", type=int, default=4, help="Number of armatures in the scene.")
+    parser.add_argument("--bones", type=int, default=32, help="Number of bones in each armature.")
+    parser.add_argument("--groups", type=int, default=8, help="Number of action groups. Each group has an action for every armature.")
+    parser.add_argument("--keyframes", type=int, default=100, help="Number of keyframes on each F-curve of the generated actions.")
+    parser.add_argument("--extra-actions", type=int, default=0, help="Number of actions that are not in any group.")
+    parser.add_argument("--list-assignments", type=int, default=200, help="Number of assignments in the group that the action assignment list is timed with.")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0], help="Multipliers for the number of armatures, groups and extra actions.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of times each measurement is repeated.")
+    parser.add_argument("--engine", choices=["NATIVE", "RIGIFY_CONVERTER"], default="NATIVE", help="Bake engine to benchmark the conversion with.")
+    parser.add_argument("--output", metavar="PATH", help="Write the results as JSON to PATH.")
+    parser.add_argument("--compare", metavar="PATH", help="Compare the results to an earlier JSON output.")
+    parser.add_argument("--max-slowdown", type=float, default=1.5, help="Largest allowed ratio to the compared timings.")
+    return parser.parse_args(argv)
+
+#
+# Scene generation.
+#
+
+def create_armature(context, name, bone_count):
+    # Creates an armature with bones in a balanced tree under a root bone, and a mesh parented to it.
+    armature = bpy.data.armatures.new(name)
+    rig_object = bpy.data.objects.new(name, armature)
+    context.scene.collection.objects.link(rig_object)
+
+    context.view_layer.objects.active = rig_object
+    bpy.ops.object.mode_set(mode="EDIT")
+    edit_bones = []
+    for i in range(bone_count):
+        edit_bone = armature.edit_bones.new("root" if i == 0 else f"bone_{i}")
+        depth = int(math.log2(i + 1))
+        edit_bone.head = (0.1 * (i % 7), 0.0, float(depth))
+        edit_bone.tail = (0.1 * (i % 7), 0.0, float(depth) + 0.5)
+        if i > 0:
+            edit_bone.parent = edit_bones[(i - 1) // 2]
+        edit_bones.append(edit_bone)
+    bpy.ops.object.mode_set(mode="OBJECT")
+
+    mesh_object = bpy.data.objects.new(f"{name}_mesh", bpy.data.meshes.new(f"{name}_mesh"))
+    context.scene.collection.objects.link(mesh_object)
+    mesh_object.parent = rig_object
+    return rig_object, mesh_object
+
+def create_action(fcurve_utils, name, rig_object, keyframe_count, seed):
+    # Creates an action with wavy location and rotation keys on every bone of the rig.
+    action = bpy.data.actions.new(name)
+    action.use_fake_user = True
+    frames = [float(x) for x in range(keyframe_count)]
+    for bone_index, pose_bone in enumerate(rig_object.pose.bones):
+        bone_path = pose_bone.path_from_id()
+        phase = seed + bone_index
+        for axis in range(3):
+            values = [0.1 * math.sin(0.1 * frame + phase + axis) for frame in frames]
+            fcurve_utils.write_fcurve(action.fcurves, f"{bone_path}.location", axis, pose_bone.name, frames, values)
+        angles = [0.5 * math.sin(0.05 * frame + phase) for frame in frames]
+        rotation = [[math.cos(x), math.sin(x), 0.0, 0.0] for x in angles]
+        for axis in range(4):
+            fcurve_utils.write_fcurve(action.fcurves, f"{bone_path}.rotation_quaternion", axis, pose_bone.name, frames, [x[axis] for x in rotation])
+    return action
+
+def generate_scene(context, package, armature_count, bone_count, group_count, keyframe_count, extra_action_count, engine):
+    fcurve_utils = importlib.import_module(f"{package.__name__}.fcurve_utils")
+    properties = context.scene.action_organizer
+    properties.bake_engine = engine
+
+    rigs = [create_armature(context, f"rig_{i}", bone_count) for i in range(armature_count)]
+    for rig_object, mesh_object in rigs:
+        rig_conversion_property = properties.rig_conversion_properties.add()
+        rig_conversion_property.rig_object = rig_object
+        rig_conversion_property.mesh_object = mesh_object
+
+    for group_index in range(group_count):
+        action_group = properties.action_groups.add()
+        action_group.name = f"group_{group_index}"
+        for rig_index, (rig_object, mesh_object) in enumerate(rigs):
+            action_assignment = action_group.action_assignments.add()
+            action_assignment.assigned_rig_object = rig_object
+            action_assignment.action = create_action(fcurve_utils, f"group_{group_index}_rig_{rig_index}", rig_object, keyframe_count, group_index)
+
+    # Extra actions only have a single F-curve, since they are only there to make bpy.data.actions bigger.
+    for i in range(extra_action_count):
+        action = bpy.data.actions.new(f"extra_{i}")
+        action.use_fake_user = True
+        fcurve_utils.write_fcurve(action.fcurves, "location", 0, "", [0.0, 1.0], [0.0, 1.0])
+
+    properties.active_action_group_index = 0
+
+def clear_scene(context):
+    properties = context.scene.action_organizer
+    properties.action_groups.clear()
+    properties.rig_conversion_properties.clear()
+    bpy.data.batch_remove(list(bpy.data.objects) + list(bpy.data.actions) + list(bpy.data.armatures) + list(bpy.data.meshes))
+
+#
+# Measurements.
+#
+
+class RecordingLayout:
+    # Stands in for a UI layout when timing draw functions in the background, where no real layouts exist.
+    # Accepts any call or attribute and counts the calls, so that only the time spent by the addon itself is measured.
+
+    def __init__(self, counter):
+        self.__dict__["counter"] = counter
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.counter[0] += 1
+            return RecordingLayout(self.counter)
+        return record
+
+    def __setattr__(self, name, value):
+        pass
+
+class DrawOwner:
+    def __init__(self):
+        self.layout = RecordingLayout([0])
+
+class ListState:
+    # Stands in for a UI list, which can not be created from Python, with the filter settings that its functions read.
+
+    def __init__(self, filter_name, use_filter_sort_alpha):
+        self.filter_name = filter_name
+        self.use_filter_sort_alpha = use_filter_sort_alpha
+        self.use_filter_invert = False
+        self.bitflag_filter_item = 1 << 30
+        self.layout_type = "DEFAULT"
+
+def measure(repeat, function, setup=None):
+    times = []
+    for i in range(repeat):
+        if setup != None:
+            setup()
+        start_time = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start_time)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "repeat": repeat,
+    }
+
+def measure_startup(repeat):
+    # Times loading the addon, which can only be measured once per process and has to happen before anything else loads it,
+    # and then registering it again after unregistering it. Also records whether loading the addon imported numpy.
+    startup = {}
+    was_loaded = hasattr(bpy.types.Scene, "action_organizer")
+    numpy_was_imported = "numpy" in sys.modules
+    start_time = time.perf_counter()
+    package = batch_convert.load_addon()
+    if not was_loaded:
+        startup["import_and_register"] = time.perf_counter() - start_time
+    if not numpy_was_imported:
+        startup["imports_numpy"] = "numpy" in sys.modules
+    startup["register"] = measure(repeat, package.register, setup=package.unregister)
+    return package, startup
+
+def run_measurements(context, package, repeat):
+    operator_module = package.action_organizer_operator
+    properties = context.scene.action_organizer
+    action_group = properties.action_groups[0]
+    results = {}
+
+    results["select_action_assignment"] = measure(repeat, lambda: bpy.ops.action_organizer.select_action_assignment(action_assignment_index=0))
+    # Stepping forward and back swaps the actions of every rig on each call, since the groups have different actions.
+    results["activate_action_group"] = measure(repeat, lambda: bpy.ops.action_organizer.activate_action_group(offset=1 if properties.active_action_group_index == 0 else -1))
+    results["convert_poll_uncached"] = measure(
+        repeat,
+        lambda: bpy.ops.action_organizer.convert_action_groups.poll(),
+        setup=operator_module.invalidate_action_group_problems,
+    )
+    results["convert_poll_cached"] = measure(repeat, lambda: bpy.ops.action_organizer.convert_action_groups.poll())
+    results["editor_draw"] = measure(repeat, lambda: operator_module.ActionGroupEditorOperator.draw(DrawOwner(), context))
+    results["header_draw"] = measure(repeat, lambda: operator_module.menu_function(DrawOwner(), context))
+    results["convert_action_group"] = measure(repeat, lambda: operator_module.convert_action_group(context, action_group))
+    # Converting everything is by far the slowest measurement, so it is only done once.
+    results["convert_all_action_groups"] = measure(1, lambda: bpy.ops.action_organizer.convert_all_action_groups())
+    return results
+
+def run_assignment_list_measurements(context, package, repeat, assignment_count):
+    # The editor only hands the assignments to template_list, so the functions of the list are timed directly over a group
+    # with many assignments. The group is removed afterwards, since it assigns the same rigs many times and can not be converted.
+    ui_list = package.action_organizer_operator.ACTION_ORGANIZER_UL_ActionAssignment
+    properties = context.scene.action_organizer
+    actions = list(bpy.data.actions)
+    rig_objects = [x.rig_object for x in properties.rig_conversion_properties]
+    action_group = properties.action_groups.add()
+    action_group.name = "assignment_list"
+    for i in range(assignment_count):
+        action_assignment = action_group.action_assignments.add()
+        action_assignment.action = actions[i % len(actions)]
+        action_assignment.assigned_rig_object = rig_objects[i % len(rig_objects)]
+
+    results = {}
+    try:
+        # Filtering by a rig name that only some of the assignments have, and sorting the rest by name.
+        list_state = ListState("rig_1", True)
+        results["assignment_list_filter"] = measure(repeat, lambda: ui_list.filter_items(list_state, context, action_group, "action_assignments"))
+
+        def draw_items():
+            layout = RecordingLayout([0])
+            for i, action_assignment in enumerate(action_group.action_assignments):
+                ui_list.draw_item(list_state, context, layout, action_group, action_assignment, 0, action_group, "active_action_assignment_index", i)
+        results["assignment_list_draw_items"] = measure(repeat, draw_items)
+    finally:
+        properties.action_groups.remove(len(properties.action_groups) - 1)
+    return results
+
+def compare_results(results, earlier_results, max_slowdown):
+    # Returns a line for each measurement that got slower than allowed.
+    regressions = []
+    earlier_register = earlier_results.get("startup", {}).get("register")
+    if earlier_register != None and earlier_register["min"] > 0.0:
+        ratio = results["startup"]["register"]["min"] / earlier_register["min"]
+        if ratio > max_slowdown:
+            regressions.append(f"startup: register is {ratio:.2f} times slower ({earlier_register['min']:.4f} s -> {results['startup']['register']['min']:.4f} s)")
+    earlier_runs = {x["scale"]: x["measurements"] for x in earlier_results["runs"]}
+    for run in results["runs"]:
+        earlier_measurements = earlier_runs.get(run["scale"], {})
+        for name, values in run["measurements"].items():
+            if name not in earlier_measurements or earlier_measurements[name]["min"] <= 0.0:
+                continue
+            ratio = values["min"] / earlier_measurements[name]["min"]
+            if ratio > max_slowdown:
+                regressions.append(f"scale {run['scale']}: {name} is {ratio:.2f} times slower ({earlier_measurements[name]['min']:.4f} s -> {values['min']:.4f} s)")
+    return regressions
+
+def main(argv=None):
+    if argv == None:
+        argv = batch_convert.script_arguments()
+    try:
+        args = parse_arguments(argv)
+    except SystemExit as e:
+        return batch_convert.EXIT_SUCCESS if e.code == 0 else batch_convert.EXIT_USAGE_ERROR
+
+    bpy.ops.wm.read_homefile(use_empty=True)
+    context = bpy.context
+    package, startup = measure_startup(args.repeat)
+    operator_module = package.action_organizer_operator
+
+    if args.engine == "RIGIFY_CONVERTER" and not operator_module.converter_is_available():
+        print("benchmark: the rigify converter addon is not enabled", file=sys.stderr)
+        return batch_convert.EXIT_CONVERTER_MISSING
+
+    results = {
+        "addon_version": operator_module.get_addon_version(),
+        "blender_version": bpy.app.version_string,
+        "arguments": {x: y for x, y in vars(args).items() if x not in ("output", "compare", "max_slowdown")},
+        "startup": startup,
+        "runs": [],
+    }
+    if "import_and_register" in startup:
+        print(f"startup: import and register {startup['import_and_register'] * 1000.0:.3f} ms")
+    print(f"startup: register min {startup['register']['min'] * 1000.0:.3f} ms    median {startup['register']['median'] * 1000.0:.3f} ms")
+    for scale in args.scales:
+        armature_count = max(1, round(args.armatures * scale))
+        group_count = max(1, round(args.groups * scale))
+        extra_action_count = round(args.extra_actions * scale)
+        list_assignment_count = max(1, round(args.list_assignments * scale))
+
+        clear_scene(context)
+        generation_start_time = time.perf_counter()
+        generate_scene(context, package, armature_count, args.bones, group_count, args.keyframes, extra_action_count, args.engine)
+        generation_seconds = time.perf_counter() - generation_start_time
+
+        measurements = run_measurements(context, package, args.repeat)
+        measurements.update(run_assignment_list_measurements(context, package, args.repeat, list_assignment_count))
+        results["runs"].append({
+            "scale": scale,
+            "armatures": armature_count,
+            "groups": group_count,
+            "extra_actions": extra_action_count,
+            "list_assignments": list_assignment_count,
+            "generation_seconds": generation_seconds,
+            "measurements": measurements,
+        })
+
+        print(f"scale {scale}: {armature_count} armatures x {args.bones} bones, {group_count} groups, {args.keyframes} keyframes, {extra_action_count} extra actions, {list_assignment_count} list assignments")
+        for name, values in measurements.items():
+            print(f"    {name:<28} min {values['min'] * 1000.0:10.3f} ms    median {values['median'] * 1000.0:10.3f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = compare_results(results, json.load(file), args.max_slowdown)
+        for regression in regressions:
+            print(f"benchmark: {regression}", file=sys.stderr)
+        if regressions:
+            return batch_convert.EXIT_CONVERSION_FAILED
+
+    return batch_convert.EXIT_SUCCESS
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+# Planning of conversion runs that convert many action groups. Rigs tend to appear in many groups, often with the same action,
+# so the order of the groups decides how many actions have to be swapped on the rigs, and identical bakes only need to be done once.
+# The planner only works with hashable keys, which the caller makes from the rigs, actions and conversion settings.
+
+def order_groups(group_assignments):
+    # Orders the groups so that each group shares as many (rig, action) assignments as possible with the rig actions
+    # left by the groups before it. group_assignments is a list of (group, {rig key: action key}) in the original order,
+    # and the first group is always converted first. Returns the groups in the new order.
+    remaining = list(group_assignments)
+    ordered = []
+    current_actions = {}
+    while remaining:
+        current_pairs = set(current_actions.items())
+        best_index = 0
+        best_score = -1
+        for i, (group, assignments) in enumerate(remaining):
+            score = len(current_pairs.intersection(assignments.items()))
+            if score > best_score:
+                best_index = i
+                best_score = score
+        group, assignments = remaining.pop(best_index)
+        ordered.append(group)
+        current_actions.update(assignments)
+    return ordered
+
+def find_reused_jobs(group_jobs):
+    # Finds the bake jobs that an earlier group already did. group_jobs is a list of (group, [(rig key, job key)]) in conversion order.
+    # Returns {group: {rig key: earlier group}} for the groups that have jobs to reuse.
+    first_groups = {}
+    reused_jobs = {}
+    for group, jobs in group_jobs:
+        for rig_key, job_key in jobs:
+            first_group = first_groups.setdefault(job_key, group)
+            if first_group != group:
+                reused_jobs.setdefault(group, {})[rig_key] = first_group
+    return reused_jobs
@@ -0,0 +1,36 @@
+import bpy
+
+# Collections in bpy.data that conversions are expected to add datablocks to.
+TRACKED_COLLECTIONS = ("actions", "objects", "armatures", "meshes", "materials", "images", "node_groups", "collections")
+
+def datablock_key(datablock):
+    # Neither the name nor the memory address alone is enough, since a removed datablock can hand either one down to a new datablock.
+    return (datablock.as_pointer(), datablock.name_full)
+
+class DatablockSnapshot:
+    # Remembers which datablocks existed when it was created so that datablocks added afterwards can be found.
+
+    def __init__(self, collections=TRACKED_COLLECTIONS):
+        self.collections = collections
+        self.existing = {name: {datablock_key(x) for x in getattr(bpy.data, name)} for name in collections}
+
+    def new_datablocks(self, collection_name):
+        existing = self.existing[collection_name]
+        return [x for x in getattr(bpy.data, collection_name) if datablock_key(x) not in existing]
+
+    def all_new_datablocks(self):
+        return {name: self.new_datablocks(name) for name in self.collections}
+
+    def remove_new_orphans(self):
+        # Removes datablocks added since the snapshot that nothing uses any more. Removing a datablock can leave the datablocks
+        # it used without users, so this is repeated until nothing is left to remove. Returns the number of removed datablocks.
+        removed_count = 0
+        while True:
+            orphans = [
+                x for name in self.collections for x in self.new_datablocks(name)
+                if x.users == 0 and not x.use_fake_user
+            ]
+            if not orphans:
+                return removed_count
+            bpy.data.batch_remove(orphans)
+            removed_count += len(orphans)
@@ -0,0 +1,46 @@
+import bpy
+import numpy as np
+
+def read_keyframe_points(keyframe_points, attribute, size=2, dtype=np.float32):
+    # Reads an attribute of every keyframe point with a single foreach_get call instead of going through the points one by one.
+    # Returns an array of shape (point count, size), or (point count,) for attributes with a single value.
+    values = np.empty(len(keyframe_points) * size, dtype=dtype)
+    keyframe_points.foreach_get(attribute, values)
+    return values.reshape(-1, size) if size > 1 else values
+
+def get_keyframe_frame_range(action, ignore_muted=False, ignore_hidden=False):
+    # Returns the first and last keyed frame of the action, or None if none of its F-curves have keyframes.
+    first_frames = []
+    last_frames = []
+    for fcurve in action.fcurves:
+        if (ignore_muted and fcurve.mute) or (ignore_hidden and fcurve.hide):
+            continue
+        if len(fcurve.keyframe_points) == 0:
+            continue
+        # Keyframes are not guaranteed to be sorted, e.g. right after they have been moved, so check all of them.
+        frames = read_keyframe_points(fcurve.keyframe_points, "co")[:, 0]
+        first_frames.append(frames.min())
+        last_frames.append(frames.max())
+
+    if not first_frames:
+        return None
+    return (float(min(first_frames)), float(max(last_frames)))
+
+def get_interpolation_value(interpolation):
+    # foreach_set takes enum values as integers.
+    return bpy.types.Keyframe.bl_rna.properties["interpolation"].enum_items[interpolation].value
+
+def write_fcurve(fcurves, data_path, index, group_name, frames, values, interpolation="LINEAR"):
+    # Creates an F-curve with a keyframe at each of the frames, setting all of them with a few foreach_set calls.
+    fcurve = fcurves.new(data_path, index=index, action_group=group_name)
+    keyframe_points = fcurve.keyframe_points
+    keyframe_points.add(len(frames))
+
+    co = np.empty(len(frames) * 2, dtype=np.float32)
+    co[0::2] = frames
+    co[1::2] = values
+    keyframe_points.foreach_set("co", co)
+    keyframe_points.foreach_set("interpolation", np.full(len(frames), get_interpolation_value(interpolation), dtype=np.int32))
+
+    fcurve.update()
+    return fcurve
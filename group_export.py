@@ -0,0 +1,74 @@
+import bpy
+import contextlib
+import os
+
+# Exporting the baked result of each action group to a file of its own as soon as the group has been converted,
+# so that the baked data can be removed before the next group instead of piling up over the whole run.
+
+EXPORT_EXTENSIONS = {
+    "FBX": ".fbx",
+    "GLTF": ".glb",
+}
+
+# Operator classes of the exporters. bpy.ops makes up an operator for any name, so the registered classes are checked instead.
+EXPORTER_OPERATOR_NAMES = {
+    "FBX": "EXPORT_SCENE_OT_fbx",
+    "GLTF": "EXPORT_SCENE_OT_gltf",
+}
+
+def exporter_is_available(export_format):
+    return hasattr(bpy.types, EXPORTER_OPERATOR_NAMES[export_format])
+
+def get_export_path(directory, action_group_name, export_format):
+    return os.path.join(directory, f"{bpy.path.clean_name(action_group_name)}{EXPORT_EXTENSIONS[export_format]}")
+
+@contextlib.contextmanager
+def export_state(context, objects, object_actions, frame_range):
+    # Selects only the exported objects, gives the rigs their baked actions and limits the scene to the baked frame range.
+    # The actions and frame range are put back afterwards. The selection is left to the caller, which restores it once for the whole conversion.
+    scene = context.scene
+    original_frame_range = (scene.frame_start, scene.frame_end)
+    original_actions = [(x, x.animation_data.action if x.animation_data != None else None) for x in object_actions]
+    try:
+        for x in context.view_layer.objects:
+            x.select_set(x in objects)
+        if objects:
+            context.view_layer.objects.active = objects[0]
+        for x, action in object_actions.items():
+            if x.animation_data == None:
+                x.animation_data_create()
+            x.animation_data.action = action
+        scene.frame_start = int(frame_range[0])
+        scene.frame_end = int(frame_range[1])
+        yield
+    finally:
+        scene.frame_start, scene.frame_end = original_frame_range
+        for x, action in original_actions:
+            x.animation_data.action = action
+
+def export_objects(context, objects, object_actions, frame_range, path, export_format):
+    # Exports the objects with their active actions to path. object_actions maps objects to the actions to export them with.
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with export_state(context, objects, object_actions, frame_range):
+        if export_format == "FBX":
+            bpy.ops.export_scene.fbx(
+                filepath=path,
+                use_selection=True,
+                object_types={"ARMATURE", "MESH"},
+                add_leaf_bones=False,
+                bake_anim=True,
+                bake_anim_use_all_actions=False,
+                bake_anim_use_nla_strips=False,
+            )
+        else:
+            bpy.ops.export_scene.gltf(
+                filepath=path,
+                export_format="GLB",
+                use_selection=True,
+                export_animations=True,
+                export_animation_mode="ACTIVE_ACTIONS",
+            )
+
+def remove_datablocks(datablocks_by_collection):
+    # Removes the datablocks in one go, which is much faster than removing them one at a time.
+    bpy.data.batch_remove([x for datablocks in datablocks_by_collection.values() for x in datablocks])
@@ -0,0 +1,50 @@
+import json
+import os
+import time
+
+# Checkpoints of a conversion run. The journal is written after every group, so that a run that was interrupted
+# or had failing groups can be resumed by converting only the groups that were not converted yet.
+
+JOURNAL_VERSION = 1
+
+class ConversionJournal:
+    def __init__(self, path, groups=None):
+        self.path = path
+        # Entry of each action group by name.
+        self.groups = groups or {}
+
+    @classmethod
+    def load(cls, path):
+        # Returns an empty journal if there is no journal at the path yet. Raises ValueError if the file is not a journal.
+        try:
+            with open(path, encoding="utf-8") as file:
+                values = json.load(file)
+        except FileNotFoundError:
+            return cls(path)
+        if values.get("version") != JOURNAL_VERSION:
+            raise ValueError(f"Unsupported conversion journal version {values.get('version')} in {path}")
+        return cls(path, values["groups"])
+
+    def is_converted(self, name, fingerprint):
+        # A group only counts as converted if it has not changed since, which is told by its fingerprint.
+        entry = self.groups.get(name)
+        return entry != None and entry["status"] == "converted" and entry["fingerprint"] == fingerprint
+
+    def record(self, name, status, fingerprint=None, error=None):
+        self.groups[name] = {
+            "status": status,
+            "fingerprint": fingerprint,
+            "error": error,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        self.write()
+
+    def write(self):
+        # The journal is written to a temporary file that then replaces the old journal, so a crash while writing can not corrupt it.
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump({"version": JOURNAL_VERSION, "groups": self.groups}, file, indent=2)
+        os.replace(temporary_path, self.path)
@@ -0,0 +1,121 @@
+import numpy as np
+
+from .fcurve_utils import get_interpolation_value, read_keyframe_points
+
+# Removes keyframes from baked actions that can be recreated by interpolating linearly between the remaining keyframes.
+
+# Values of channels that do not need to be keyed at all, by data path suffix and array index.
+DEFAULT_VALUES = {
+    "location": (0.0, 0.0, 0.0),
+    "rotation_quaternion": (1.0, 0.0, 0.0, 0.0),
+    "rotation_euler": (0.0, 0.0, 0.0),
+    "rotation_axis_angle": (0.0, 0.0, 1.0, 0.0),
+    "scale": (1.0, 1.0, 1.0),
+}
+
+def get_channel_type(data_path):
+    return data_path.rsplit(".", 1)[-1]
+
+def find_keys_to_keep(frames, values, tolerance):
+    # Returns a mask of the keys that have to be kept so that no original key is further than the tolerance from the reduced curve.
+    # Each pass tries removing every other remaining key at once and puts back the ones that caused too large an error,
+    # alternating which half is tried, until neither half can lose any more keys.
+    keep = np.ones(len(frames), dtype=bool)
+    parity = 0
+    passes_without_progress = 0
+    while passes_without_progress < 2:
+        kept_indices = np.flatnonzero(keep)
+        if len(kept_indices) <= 2:
+            break
+
+        # Only interior keys that are not next to each other are removed in the same pass,
+        # so there is at most one removed key between any two keys that are left.
+        candidate_indices = kept_indices[np.arange(1 + parity, len(kept_indices) - 1, 2)]
+        parity = 1 - parity
+        if len(candidate_indices) == 0:
+            passes_without_progress += 1
+            continue
+
+        trial = keep.copy()
+        trial[candidate_indices] = False
+        trial_indices = np.flatnonzero(trial)
+        errors = np.abs(np.interp(frames, frames[trial_indices], values[trial_indices]) - values)
+
+        # Put back the removed key between the two remaining keys that surround each key with a too large error.
+        failing_indices = np.flatnonzero(errors > tolerance)
+        if len(failing_indices) > 0:
+            span_starts = trial_indices[np.searchsorted(trial_indices, failing_indices) - 1]
+            restored_positions = np.minimum(np.searchsorted(candidate_indices, span_starts, side="right"), len(candidate_indices) - 1)
+            trial[candidate_indices[restored_positions]] = True
+
+        removed_count = np.count_nonzero(keep) - np.count_nonzero(trial)
+        passes_without_progress = passes_without_progress + 1 if removed_count == 0 else 0
+        keep = trial
+    return keep
+
+def rewrite_keyframes(fcurves, fcurve, keep):
+    # Replaces the F-curve with one that only has the kept keyframes.
+    # Keyframe points can not be removed in bulk, so it is faster to write a new F-curve than to remove the points one by one.
+    # The kept keyframes are interpolated linearly, since that is what the error of the reduction was measured with.
+    # Bezier keyframes would get new handles over the longer gaps and could go arbitrarily far from the baked values.
+    co = read_keyframe_points(fcurve.keyframe_points, "co")[keep]
+
+    data_path = fcurve.data_path
+    array_index = fcurve.array_index
+    group_name = fcurve.group.name if fcurve.group != None else ""
+    extrapolation = fcurve.extrapolation
+    mute = fcurve.mute
+    fcurves.remove(fcurve)
+
+    new_fcurve = fcurves.new(data_path, index=array_index, action_group=group_name)
+    new_fcurve.extrapolation = extrapolation
+    new_fcurve.mute = mute
+    new_keyframe_points = new_fcurve.keyframe_points
+    new_keyframe_points.add(len(co))
+    new_keyframe_points.foreach_set("co", co.ravel())
+    new_keyframe_points.foreach_set("interpolation", np.full(len(co), get_interpolation_value("LINEAR"), dtype=np.int32))
+    new_fcurve.update()
+
+def reduce_action(action, tolerances, remove_constant_channels=True):
+    # Reduces the keyframes of the transform channels of the action.
+    # tolerances maps "location", "rotation" and "scale" to the largest allowed error of the channels of that kind.
+    # Returns the number of keyframes in the action before and after the reduction.
+    keys_before = 0
+    keys_after = 0
+    fcurves = action.fcurves
+    for fcurve in list(fcurves):
+        keyframe_points = fcurve.keyframe_points
+        key_count = len(keyframe_points)
+        keys_before += key_count
+
+        channel_type = get_channel_type(fcurve.data_path)
+        tolerance = tolerances.get("rotation" if channel_type.startswith("rotation_") else channel_type)
+        if tolerance == None or key_count < 2:
+            keys_after += key_count
+            continue
+
+        co = read_keyframe_points(keyframe_points, "co").astype(np.float64)
+        frames = co[:, 0]
+        values = co[:, 1]
+        if np.any(np.diff(frames) <= 0.0):
+            # Interpolating needs the keyframes to be in order, which baked keyframes always are.
+            keys_after += key_count
+            continue
+
+        if np.ptp(values) <= tolerance:
+            # A constant channel that stays at its default value does the same as no channel at all.
+            default_values = DEFAULT_VALUES.get(channel_type)
+            is_default = default_values != None and fcurve.array_index < len(default_values) and np.all(np.abs(values - default_values[fcurve.array_index]) <= tolerance)
+            if remove_constant_channels and is_default:
+                fcurves.remove(fcurve)
+                continue
+            keep = np.zeros(key_count, dtype=bool)
+            keep[0] = True
+        else:
+            keep = find_keys_to_keep(frames, values, tolerance)
+
+        kept_count = int(np.count_nonzero(keep))
+        if kept_count < key_count:
+            rewrite_keyframes(fcurves, fcurve, keep)
+        keys_after += kept_count
+    return keys_before, keys_after
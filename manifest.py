@@ -0,0 +1,195 @@
+import json
+
+# Action group definitions as a JSON manifest that refers to actions and objects by name,
+# so that pipeline tools can read and edit the groups of a file without opening it in Blender.
+
+MANIFEST_VERSION = 1
+
+# Settings of action groups and rig conversion properties that are written to the manifest.
+# Datablock pointers are written separately by name, and state such as fingerprints is left out.
+ACTION_GROUP_SETTINGS = (
+    "frame_range_source",
+    "ignore_muted_fcurves",
+    "ignore_hidden_fcurves",
+    "use_manual_frame_ranges",
+    "use_keyframe_reduction",
+    "location_tolerance",
+    "rotation_tolerance",
+    "scale_tolerance",
+    "remove_constant_channels",
+)
+RIG_CONVERSION_SETTINGS = (
+    "rig_root_name",
+)
+
+def datablock_name(datablock):
+    return datablock.name if datablock != None else None
+
+def export_manifest(properties):
+    return {
+        "version": MANIFEST_VERSION,
+        "action_groups": [
+            {
+                "name": action_group.name,
+                "settings": {x: getattr(action_group, x) for x in ACTION_GROUP_SETTINGS},
+                "action_assignments": [
+                    {"action": datablock_name(x.action), "rig": datablock_name(x.assigned_rig_object)}
+                    for x in action_group.action_assignments
+                ],
+            }
+            for action_group in properties.action_groups
+        ],
+        "rig_conversion_properties": [
+            {
+                "rig": datablock_name(x.rig_object),
+                "mesh": datablock_name(x.mesh_object),
+                "settings": {name: getattr(x, name) for name in RIG_CONVERSION_SETTINGS},
+            }
+            for x in properties.rig_conversion_properties
+            if x.rig_object != None
+        ],
+    }
+
+def get_setting_problem(rna_property, value):
+    # Returns why the value can not be given to the property, or None if it can.
+    if rna_property.type == "ENUM":
+        identifiers = [x.identifier for x in rna_property.enum_items]
+        if value not in identifiers:
+            return f"has to be one of {', '.join(identifiers)}"
+        return None
+    if rna_property.type == "BOOLEAN":
+        return None if isinstance(value, bool) else "has to be true or false"
+    if rna_property.type == "STRING":
+        return None if isinstance(value, str) else "has to be a string"
+    if rna_property.type == "INT" and not (isinstance(value, int) and not isinstance(value, bool)):
+        return "has to be an integer"
+    if rna_property.type == "FLOAT" and not (isinstance(value, (int, float)) and not isinstance(value, bool)):
+        return "has to be a number"
+    if not rna_property.hard_min <= value <= rna_property.hard_max:
+        return f"has to be between {rna_property.hard_min} and {rna_property.hard_max}"
+    return None
+
+def check_settings(values, setting_names, rna_properties, location):
+    if not isinstance(values, dict):
+        raise ValueError(f"Settings of {location} have to be a JSON object")
+    for name, value in values.items():
+        if name not in setting_names:
+            raise ValueError(f"Unknown setting \"{name}\" in {location}")
+        problem = get_setting_problem(rna_properties[name], value)
+        if problem != None:
+            raise ValueError(f"Setting \"{name}\" of {location} {problem}, not {json.dumps(value)}")
+
+def get_list(values, key, location):
+    items = values.get(key, [])
+    if not isinstance(items, list):
+        raise ValueError(f"\"{key}\" of {location} has to be a JSON array")
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValueError(f"Items of \"{key}\" of {location} have to be JSON objects")
+    return items
+
+def check_object_name(values, key, objects, object_type, location, required=False):
+    # Names of objects that do not exist are allowed, since they are reported as missing, but existing objects have to be of the right type.
+    name = values.get(key)
+    if name == None and not required:
+        return
+    if not isinstance(name, str):
+        raise ValueError(f"\"{key}\" of {location} has to be the name of an object")
+    datablock = objects.get(name)
+    if datablock != None and datablock.type != object_type:
+        raise ValueError(f"\"{key}\" of {location} has to name an object of type {object_type}, but \"{name}\" is of type {datablock.type}")
+
+def check_manifest(properties, manifest, objects):
+    # Raises ValueError if the manifest can not be imported. Everything is checked before anything is changed,
+    # so that a bad manifest does not leave the import half done.
+    if not isinstance(manifest, dict):
+        raise ValueError("The action group manifest has to be a JSON object")
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported action group manifest version {manifest.get('version')}")
+
+    # The settings are checked against the property definitions, so that the types and enum items do not have to be repeated here.
+    group_rna_properties = properties.bl_rna.properties["action_groups"].fixed_type.properties
+    rig_rna_properties = properties.bl_rna.properties["rig_conversion_properties"].fixed_type.properties
+
+    for i, group_values in enumerate(get_list(manifest, "action_groups", "the manifest")):
+        name = group_values.get("name")
+        if not isinstance(name, str) or name == "":
+            raise ValueError(f"Action group {i + 1} of the manifest has no name")
+        location = f"action group \"{name}\""
+        check_settings(group_values.get("settings", {}), ACTION_GROUP_SETTINGS, group_rna_properties, location)
+        for assignment_values in get_list(group_values, "action_assignments", location):
+            action_name = assignment_values.get("action")
+            if action_name != None and not isinstance(action_name, str):
+                raise ValueError(f"\"action\" of an assignment in {location} has to be the name of an action")
+            check_object_name(assignment_values, "rig", objects, "ARMATURE", f"an assignment in {location}")
+
+    for rig_values in get_list(manifest, "rig_conversion_properties", "the manifest"):
+        check_object_name(rig_values, "rig", objects, "ARMATURE", "rig conversion settings", required=True)
+        location = f"the conversion settings of rig \"{rig_values['rig']}\""
+        check_object_name(rig_values, "mesh", objects, "MESH", location)
+        check_settings(rig_values.get("settings", {}), RIG_CONVERSION_SETTINGS, rig_rna_properties, location)
+
+def import_manifest(properties, manifest, actions, objects):
+    # Updates the properties to match the manifest. Groups and rig settings are matched by name, and the assignments of
+    # each group in the manifest are replaced, so importing the same manifest again changes nothing.
+    # Groups and rigs that are not in the manifest are left alone. Returns the names the manifest refers to that do not exist.
+    # Raises ValueError without changing anything if the manifest can not be imported.
+    check_manifest(properties, manifest, objects)
+
+    missing_names = []
+
+    def find(collection, name):
+        if name == None:
+            return None
+        datablock = collection.get(name)
+        if datablock == None:
+            missing_names.append(name)
+        return datablock
+
+    # Items are looked up by index, since adding to a collection can move its existing items in memory.
+    group_indices = {x.name: i for i, x in enumerate(properties.action_groups)}
+    for group_values in manifest.get("action_groups", []):
+        group_index = group_indices.get(group_values["name"])
+        if group_index == None:
+            properties.action_groups.add().name = group_values["name"]
+            group_index = len(properties.action_groups) - 1
+            group_indices[group_values["name"]] = group_index
+        action_group = properties.action_groups[group_index]
+
+        for name, value in group_values.get("settings", {}).items():
+            setattr(action_group, name, value)
+
+        # Assignments whose datablocks are missing are kept empty, so that the gap shows in the editor.
+        action_group.action_assignments.clear()
+        for assignment_values in group_values.get("action_assignments", []):
+            action_assignment = action_group.action_assignments.add()
+            action_assignment.action = find(actions, assignment_values.get("action"))
+            action_assignment.assigned_rig_object = find(objects, assignment_values.get("rig"))
+        action_group.active_action_assignment_index = min(action_group.active_action_assignment_index, max(0, len(action_group.action_assignments) - 1))
+
+    rig_indices = {x.rig_object.name: i for i, x in enumerate(properties.rig_conversion_properties) if x.rig_object != None}
+    for rig_values in manifest.get("rig_conversion_properties", []):
+        rig_index = rig_indices.get(rig_values["rig"])
+        if rig_index == None:
+            rig_object = find(objects, rig_values["rig"])
+            if rig_object == None:
+                continue
+            properties.rig_conversion_properties.add().rig_object = rig_object
+            rig_index = len(properties.rig_conversion_properties) - 1
+            rig_indices[rig_values["rig"]] = rig_index
+        rig_conversion_property = properties.rig_conversion_properties[rig_index]
+
+        rig_conversion_property.mesh_object = find(objects, rig_values.get("mesh"))
+        for name, value in rig_values.get("settings", {}).items():
+            setattr(rig_conversion_property, name, value)
+
+    return missing_names
+
+def write_manifest(path, manifest):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+        file.write("\n")
+
+def read_manifest(path):
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
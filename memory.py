@@ -0,0 +1,12 @@
+import os
+
+# Memory use of the Blender process, for keeping long conversion runs within the memory of the machine.
+
+def get_resident_memory():
+    # Returns the resident set size of this process in bytes, or None where it can not be read.
+    try:
+        with open("/proc/self/statm", encoding="ascii") as file:
+            resident_pages = int(file.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
@@ -0,0 +1,36 @@
+import re
+
+# Matching action names against patterns such as "{group}_{rig}" to find the action group and rig each action belongs to.
+
+FIELDS = ("group", "rig")
+
+def compile_action_name_pattern(pattern, rig_names):
+    # Returns a regular expression that matches whole action names and captures the group and rig names.
+    # The rig field only matches the given rig names, longest first, so that underscores in group and rig names
+    # do not make a match ambiguous. Raises ValueError if the pattern can not be used.
+    parts = re.split(r"(\{\w*\})", pattern)
+    fields = [x[1:-1] for x in parts[1::2]]
+    for field in fields:
+        if field not in FIELDS:
+            raise ValueError(f"Unknown field \"{{{field}}}\" in action name pattern \"{pattern}\"")
+    for field in FIELDS:
+        if fields.count(field) != 1:
+            raise ValueError(f"Action name pattern \"{pattern}\" has to contain {{{field}}} exactly once")
+    if len(rig_names) == 0:
+        raise ValueError("There are no rigs to match action names to")
+
+    rig_expression = "|".join(re.escape(x) for x in sorted(rig_names, key=len, reverse=True))
+    expressions = {
+        "group": r"(?P<group>.+?)",
+        "rig": f"(?P<rig>{rig_expression})",
+    }
+    return re.compile("".join(expressions[x[1:-1]] if i % 2 == 1 else re.escape(x) for i, x in enumerate(parts)))
+
+def match_action_names(actions, expression):
+    # Goes through the actions once and returns {group name: {rig name: action}} for the actions whose names match.
+    matches = {}
+    for action in actions:
+        match = expression.fullmatch(action.name)
+        if match != None:
+            matches.setdefault(match.group("group"), {})[match.group("rig")] = action
+    return matches
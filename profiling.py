@@ -0,0 +1,127 @@
+import contextlib
+import csv
+import json
+import time
+
+# Timing of conversion runs, to find out where the time of a slow run goes and to compare runs between versions.
+
+class GroupTiming:
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.frames = 0
+        self.keys_written = 0
+        self.sections = {}
+        self.rigs = []
+
+    @classmethod
+    def from_dict(cls, values):
+        timing = cls(values["name"])
+        timing.seconds = values["seconds"]
+        timing.frames = values["frames"]
+        timing.keys_written = values["keys_written"]
+        timing.sections = dict(values["sections"])
+        timing.rigs = [(x["name"], x["seconds"]) for x in values["rigs"]]
+        return timing
+
+    @property
+    def frames_per_second(self):
+        return self.frames / self.seconds if self.seconds > 0.0 else 0.0
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "seconds": round(self.seconds, 4),
+            "frames": self.frames,
+            "frames_per_second": round(self.frames_per_second, 2),
+            "keys_written": self.keys_written,
+            "sections": {name: round(seconds, 4) for name, seconds in self.sections.items()},
+            "rigs": [{"name": name, "seconds": round(seconds, 4)} for name, seconds in self.rigs],
+        }
+
+class BakeProfiler:
+    # Collects the time spent in each group, rig and section of a conversion run.
+
+    def __init__(self, metadata=None):
+        self.metadata = metadata or {}
+        self.groups = []
+        self.current_group = None
+        self.start_time = time.perf_counter()
+        self.seconds = 0.0
+
+    @contextlib.contextmanager
+    def group(self, name):
+        # Only groups that were converted are recorded, since a failed group would count as converted with no frames
+        # in the summary and pull down the frames per second that the remaining time of a run is estimated from.
+        self.current_group = GroupTiming(name)
+        start_time = time.perf_counter()
+        try:
+            yield self.current_group
+            self.current_group.seconds = time.perf_counter() - start_time
+            self.groups.append(self.current_group)
+        finally:
+            self.current_group = None
+
+    @contextlib.contextmanager
+    def section(self, name):
+        # Time spent in sections with the same name is added together.
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.current_group != None:
+                sections = self.current_group.sections
+                sections[name] = sections.get(name, 0.0) + time.perf_counter() - start_time
+
+    @contextlib.contextmanager
+    def rig(self, name):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.current_group != None:
+                self.current_group.rigs.append((name, time.perf_counter() - start_time))
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self.start_time
+
+    def summary_lines(self):
+        total_frames = sum(x.frames for x in self.groups)
+        total_keys = sum(x.keys_written for x in self.groups)
+        frames_per_second = total_frames / self.seconds if self.seconds > 0.0 else 0.0
+        lines = [f"Converted {len(self.groups)} group(s) in {self.seconds:.2f} s, {total_frames} frames at {frames_per_second:.1f} frames/s, {total_keys} keys written"]
+        for group in sorted(self.groups, key=lambda x: x.seconds, reverse=True):
+            sections = ", ".join(f"{name} {seconds:.2f} s" for name, seconds in sorted(group.sections.items(), key=lambda x: x[1], reverse=True))
+            lines.append(f"{group.name}: {group.seconds:.2f} s, {group.frames_per_second:.1f} frames/s, {group.keys_written} keys ({sections})")
+        return lines
+
+    def as_dict(self):
+        return {
+            **self.metadata,
+            "seconds": round(self.seconds, 4),
+            "groups": [x.as_dict() for x in self.groups],
+        }
+
+    def write_log(self, path):
+        # Writes a CSV file with a row for each group and rig if the path ends with .csv, and a JSON file otherwise.
+        if path.lower().endswith(".csv"):
+            self.write_csv(path)
+        else:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(self.as_dict(), file, indent=2)
+
+    def write_csv(self, path):
+        section_names = sorted({name for x in self.groups for name in x.sections})
+        metadata_names = sorted(self.metadata)
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(metadata_names + ["group", "rig", "seconds", "frames", "frames_per_second", "keys_written"] + section_names)
+            metadata_values = [self.metadata[x] for x in metadata_names]
+            for group in self.groups:
+                writer.writerow(
+                    metadata_values
+                    + [group.name, "", f"{group.seconds:.4f}", group.frames, f"{group.frames_per_second:.2f}", group.keys_written]
+                    + [f"{group.sections.get(x, 0.0):.4f}" for x in section_names]
+                )
+                for rig_name, seconds in group.rigs:
+                    writer.writerow(metadata_values + [group.name, rig_name, f"{seconds:.4f}", "", "", ""] + ["" for x in section_names])
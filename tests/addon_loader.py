@@ -0,0 +1,25 @@
+import importlib
+import importlib.util
+import os
+import sys
+
+# Loading the addon modules from a checkout for the tests.
+
+PACKAGE_NAME = "action_organizer"
+ADDON_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_module(name):
+    # Loads the addon as a package the way Blender does, so that its relative imports work from a checkout of any name.
+    if PACKAGE_NAME not in sys.modules:
+        spec = importlib.util.spec_from_file_location(PACKAGE_NAME, os.path.join(ADDON_DIRECTORY, "__init__.py"), submodule_search_locations=[ADDON_DIRECTORY])
+        package = importlib.util.module_from_spec(spec)
+        sys.modules[PACKAGE_NAME] = package
+        spec.loader.exec_module(package)
+    return importlib.import_module(f"{PACKAGE_NAME}.{name}")
+
+def load_standalone_module(name):
+    # Loads a module that does not import bpy or other modules of the addon, so that its tests also run without Blender.
+    spec = importlib.util.spec_from_file_location(f"{PACKAGE_NAME}_{name}", os.path.join(ADDON_DIRECTORY, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
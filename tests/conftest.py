@@ -0,0 +1,12 @@
+import pytest
+
+from addon_loader import load_module
+
+@pytest.fixture(scope="session")
+def registered_addon():
+    # Registers the addon once for all tests that need its properties. Returns the operator module.
+    pytest.importorskip("bpy")
+    operator_module = load_module("action_organizer_operator")
+    operator_module.register()
+    yield operator_module
+    operator_module.unregister()
@@ -0,0 +1,33 @@
+from addon_loader import load_standalone_module
+
+conversion_planner = load_standalone_module("conversion_planner")
+
+def test_order_groups_keeps_first_group_and_follows_shared_actions():
+    group_assignments = [
+        ("walk", {"hero": "walk", "prop": "px"}),
+        ("run", {"hero": "run", "prop": "pr"}),
+        ("walk_2", {"hero": "walk", "prop": "py"}),
+        ("idle", {"hero": "idle"}),
+    ]
+    assert conversion_planner.order_groups(group_assignments) == ["walk", "walk_2", "run", "idle"]
+
+def test_order_groups_keeps_original_order_of_unrelated_groups():
+    group_assignments = [(x, {x: x}) for x in ("a", "b", "c")]
+    assert conversion_planner.order_groups(group_assignments) == ["a", "b", "c"]
+
+def test_order_groups_of_nothing():
+    assert conversion_planner.order_groups([]) == []
+
+def test_find_reused_jobs_points_to_first_group_with_the_job():
+    group_jobs = [
+        ("walk", [("hero", "walk_job"), ("prop", "px_job")]),
+        ("walk_2", [("hero", "walk_job"), ("prop", "py_job")]),
+        ("walk_3", [("hero", "walk_job"), ("prop", "py_job")]),
+    ]
+    assert conversion_planner.find_reused_jobs(group_jobs) == {
+        "walk_2": {"hero": "walk"},
+        "walk_3": {"hero": "walk", "prop": "walk_2"},
+    }
+
+def test_find_reused_jobs_does_not_reuse_within_a_group():
+    assert conversion_planner.find_reused_jobs([("walk", [("hero", "job"), ("prop", "job")])]) == {}
@@ -0,0 +1,111 @@
+import pytest
+
+bpy = pytest.importorskip("bpy")
+
+from addon_loader import load_module
+
+operator_module = load_module("action_organizer_operator")
+
+def create_rig(name):
+    armature = bpy.data.armatures.new(name)
+    rig_object = bpy.data.objects.new(name, armature)
+    bpy.context.scene.collection.objects.link(rig_object)
+    bpy.context.view_layer.objects.active = rig_object
+    bpy.ops.object.mode_set(mode="EDIT")
+    bone = armature.edit_bones.new("root")
+    bone.tail = (0.0, 0.0, 1.0)
+    bpy.ops.object.mode_set(mode="OBJECT")
+    return rig_object
+
+def create_action(name, offset):
+    action = bpy.data.actions.new(name)
+    for index in range(3):
+        fcurve = action.fcurves.new('pose.bones["root"].location', index=index, action_group="root")
+        fcurve.keyframe_points.insert(1.0, offset)
+        fcurve.keyframe_points.insert(10.0, offset + 1.0)
+    return action
+
+@pytest.fixture
+def scene(registered_addon):
+    scene = bpy.context.scene
+    properties = scene.action_organizer
+    properties.bake_engine = "NATIVE"
+    rig_objects = {name: create_rig(name) for name in ("Hero", "Prop")}
+    actions = {name: create_action(name, offset) for offset, name in enumerate(("walk", "px", "py"))}
+    for rig_object in rig_objects.values():
+        properties.rig_conversion_properties.add().rig_object = rig_object
+    for group_name, assignments in (("Walk", (("Hero", "walk"), ("Prop", "px"))), ("Walk2", (("Hero", "walk"), ("Prop", "py")))):
+        action_group = properties.action_groups.add()
+        action_group.name = group_name
+        for rig_name, action_name in assignments:
+            action_assignment = action_group.action_assignments.add()
+            action_assignment.assigned_rig_object = rig_objects[rig_name]
+            action_assignment.action = actions[action_name]
+    operator_module.invalidate_rig_conversion_index()
+    yield scene
+
+    properties.action_groups.clear()
+    properties.rig_conversion_properties.clear()
+    operator_module.invalidate_rig_conversion_index()
+    for rig_object in rig_objects.values():
+        armature = rig_object.data
+        bpy.data.objects.remove(rig_object)
+        bpy.data.armatures.remove(armature)
+    for action in list(bpy.data.actions):
+        bpy.data.actions.remove(action)
+
+def test_reused_bakes_give_every_group_an_action_for_every_rig(scene):
+    context = bpy.context
+    properties = scene.action_organizer
+    ordered_indices, reused_jobs = operator_module.plan_conversion(context, [0, 1])
+    assert ordered_indices == [0, 1]
+    assert reused_jobs == {1: {"Hero": 0}}
+
+    results = []
+    for index in ordered_indices:
+        reused_rigs = {rig_name: properties.action_groups[earlier_index] for rig_name, earlier_index in reused_jobs.get(index, {}).items()}
+        results.append(operator_module.convert_action_group(context, properties.action_groups[index], reused_rigs=reused_rigs))
+
+    assert [x.name for x in results[1].reused_rigs] == ["Hero"]
+    for action_group, result in zip(properties.action_groups, results):
+        expected_names = {f"{action_group.name}_{x.assigned_rig_object.name}{properties.baked_action_suffix}" for x in action_group.action_assignments}
+        assert {x.name for x in result.baked_actions} == expected_names
+        assert {rig_object.name for rig_object, action in result.rig_actions} == {"Hero", "Prop"}
+
+    # The copy has the same keys as the bake it was made from.
+    earlier_action = bpy.data.actions[f"Walk_Hero{properties.baked_action_suffix}"]
+    copied_action = bpy.data.actions[f"Walk2_Hero{properties.baked_action_suffix}"]
+    assert copied_action != earlier_action
+    assert [(x.data_path, x.array_index, [tuple(key.co) for key in x.keyframe_points]) for x in copied_action.fcurves] == \
+        [(x.data_path, x.array_index, [tuple(key.co) for key in x.keyframe_points]) for x in earlier_action.fcurves]
+
+def test_converting_again_replaces_copied_bakes(scene):
+    context = bpy.context
+    properties = scene.action_organizer
+    for _ in range(2):
+        ordered_indices, reused_jobs = operator_module.plan_conversion(context, [0, 1])
+        for index in ordered_indices:
+            reused_rigs = {rig_name: properties.action_groups[earlier_index] for rig_name, earlier_index in reused_jobs.get(index, {}).items()}
+            operator_module.convert_action_group(context, properties.action_groups[index], reused_rigs=reused_rigs)
+    suffix = properties.baked_action_suffix
+    assert sorted(x.name for x in bpy.data.actions if x.name.startswith("Walk")) == sorted(f"{group}_{rig}{suffix}" for group in ("Walk", "Walk2") for rig in ("Hero", "Prop"))
+
+def test_groups_that_share_rig_actions_are_converted_together(scene):
+    properties = scene.action_organizer
+    action_group = properties.action_groups.add()
+    action_group.name = "Idle"
+    action_assignment = action_group.action_assignments.add()
+    action_assignment.assigned_rig_object = bpy.data.objects["Hero"]
+    action_assignment.action = create_action("idle", 5.0)
+    properties.action_groups.move(2, 1)
+
+    ordered_indices, reused_jobs = operator_module.plan_conversion(bpy.context, [0, 1, 2])
+    assert ordered_indices == [0, 2, 1]
+
+def test_renamed_groups_count_as_changed(scene):
+    context = bpy.context
+    action_group = scene.action_organizer.action_groups[0]
+    operator_module.convert_action_group(context, action_group)
+    assert not operator_module.action_group_has_changed(context, action_group)
+    action_group.name = "Run"
+    assert operator_module.action_group_has_changed(context, action_group)
@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from addon_loader import load_standalone_module
+
+journal = load_standalone_module("journal")
+
+def test_recorded_groups_are_read_back(tmp_path):
+    path = str(tmp_path / "runs" / "journal.json")
+    conversion_journal = journal.ConversionJournal(path)
+    conversion_journal.record("walk", "converted", fingerprint="abc")
+    conversion_journal.record("run", "failed", error="No keyframes")
+
+    loaded_journal = journal.ConversionJournal.load(path)
+    assert loaded_journal.is_converted("walk", "abc")
+    assert not loaded_journal.is_converted("walk", "changed")
+    assert not loaded_journal.is_converted("run", None)
+    assert not loaded_journal.is_converted("idle", None)
+    assert loaded_journal.groups["run"]["error"] == "No keyframes"
+    assert not (tmp_path / "runs" / "journal.json.tmp").exists()
+
+def test_missing_journal_is_empty(tmp_path):
+    assert journal.ConversionJournal.load(str(tmp_path / "journal.json")).groups == {}
+
+def test_unsupported_version_is_rejected(tmp_path):
+    path = tmp_path / "journal.json"
+    path.write_text(json.dumps({"version": journal.JOURNAL_VERSION + 1, "groups": {}}))
+    with pytest.raises(ValueError):
+        journal.ConversionJournal.load(str(path))
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+bpy = pytest.importorskip("bpy")
+
+from addon_loader import load_module
+
+keyframe_reduction = load_module("keyframe_reduction")
+fcurve_utils = load_module("fcurve_utils")
+
+def get_max_error(frames, values, keep):
+    return np.max(np.abs(np.interp(frames, frames[keep], values[keep]) - values))
+
+@pytest.fixture
+def action():
+    action = bpy.data.actions.new("test_keyframe_reduction")
+    yield action
+    bpy.data.actions.remove(action)
+
+@pytest.mark.parametrize("tolerance", [1e-5, 1e-3, 1e-2, 0.1])
+def test_find_keys_to_keep_stays_within_tolerance(tolerance):
+    generator = np.random.default_rng(0)
+    frames = np.arange(500, dtype=np.float64)
+    curves = [
+        np.sin(frames * 0.05),
+        np.cumsum(generator.normal(0.0, 0.01, len(frames))),
+        np.where(frames < 250, 0.0, 1.0),
+        frames * 0.01,
+    ]
+    for values in curves:
+        keep = keyframe_reduction.find_keys_to_keep(frames, values, tolerance)
+        assert keep[0] and keep[-1]
+        assert get_max_error(frames, values, keep) <= tolerance
+
+def test_find_keys_to_keep_removes_keys_of_straight_lines():
+    frames = np.arange(100, dtype=np.float64)
+    keep = keyframe_reduction.find_keys_to_keep(frames, frames * 0.5 + 1.0, 1e-6)
+    assert np.count_nonzero(keep) == 2
+
+def test_reduce_action_removes_constant_default_channels(action):
+    frames = np.arange(10, dtype=np.float32)
+    fcurve_utils.write_fcurve(action.fcurves, 'pose.bones["a"].location', 0, "a", frames, np.zeros(10))
+    fcurve_utils.write_fcurve(action.fcurves, 'pose.bones["a"].rotation_quaternion', 0, "a", frames, np.ones(10))
+    fcurve_utils.write_fcurve(action.fcurves, 'pose.bones["a"].scale', 0, "a", frames, np.full(10, 2.0))
+
+    keys_before, keys_after = keyframe_reduction.reduce_action(action, {"location": 1e-4, "rotation": 1e-4, "scale": 1e-4})
+
+    assert keys_before == 30
+    # The location and rotation stay at their defaults and are removed, the scale is constant but not the default and keeps one key.
+    assert [x.data_path for x in action.fcurves] == ['pose.bones["a"].scale']
+    assert keys_after == 1
+    assert action.fcurves[0].evaluate(5.0) == pytest.approx(2.0)
+
+def test_reduce_action_keeps_constant_default_channels_if_asked_to(action):
+    frames = np.arange(10, dtype=np.float32)
+    fcurve_utils.write_fcurve(action.fcurves, 'pose.bones["a"].location', 0, "a", frames, np.zeros(10))
+
+    keyframe_reduction.reduce_action(action, {"location": 1e-4}, remove_constant_channels=False)
+
+    assert len(action.fcurves) == 1
+    assert len(action.fcurves[0].keyframe_points) == 1
+
+def test_reduced_bezier_curves_stay_within_tolerance(action):
+    tolerance = 1e-3
+    frames = np.arange(200, dtype=np.float32)
+    values = np.sin(frames * 0.1).astype(np.float32)
+    fcurve_utils.write_fcurve(action.fcurves, 'pose.bones["a"].location', 1, "a", frames, values, interpolation="BEZIER")
+
+    keys_before, keys_after = keyframe_reduction.reduce_action(action, {"location": tolerance})
+
+    fcurve = action.fcurves[0]
+    assert keys_after < keys_before
+    assert all(x.interpolation == "LINEAR" for x in fcurve.keyframe_points)
+    errors = [abs(fcurve.evaluate(frame) - value) for frame, value in zip(frames, values)]
+    # The values are stored as 32 bit floats, which adds a little on top of the tolerance.
+    assert max(errors) <= tolerance + 1e-6
@@ -0,0 +1,95 @@
+import copy
+
+import pytest
+
+bpy = pytest.importorskip("bpy")
+
+from addon_loader import load_module
+
+manifest = load_module("manifest")
+
+@pytest.fixture
+def scene(registered_addon):
+    scene = bpy.context.scene
+    armature = bpy.data.armatures.new("Hero")
+    rig_object = bpy.data.objects.new("Hero", armature)
+    mesh = bpy.data.meshes.new("Body")
+    mesh_object = bpy.data.objects.new("Body", mesh)
+    for x in (rig_object, mesh_object):
+        scene.collection.objects.link(x)
+    action = bpy.data.actions.new("walk")
+    yield scene
+
+    properties = scene.action_organizer
+    properties.action_groups.clear()
+    properties.rig_conversion_properties.clear()
+    bpy.data.objects.remove(rig_object)
+    bpy.data.objects.remove(mesh_object)
+    bpy.data.armatures.remove(armature)
+    bpy.data.meshes.remove(mesh)
+    bpy.data.actions.remove(action)
+
+def import_manifest(scene, values):
+    return manifest.import_manifest(scene.action_organizer, values, bpy.data.actions, scene.objects)
+
+VALID_MANIFEST = {
+    "version": manifest.MANIFEST_VERSION,
+    "action_groups": [
+        {
+            "name": "Walk",
+            "settings": {"frame_range_source": "KEYFRAMES", "use_keyframe_reduction": True, "location_tolerance": 0.01},
+            "action_assignments": [{"action": "walk", "rig": "Hero"}, {"action": "missing", "rig": None}],
+        },
+    ],
+    "rig_conversion_properties": [
+        {"rig": "Hero", "mesh": "Body", "settings": {"rig_root_name": "base"}},
+    ],
+}
+
+def test_exported_manifest_imports_without_changes(scene):
+    properties = scene.action_organizer
+    assert import_manifest(scene, VALID_MANIFEST) == ["missing"]
+    action_group = properties.action_groups["Walk"]
+    assert action_group.frame_range_source == "KEYFRAMES"
+    assert [(x.action.name if x.action else None, x.assigned_rig_object.name if x.assigned_rig_object else None) for x in action_group.action_assignments] == [("walk", "Hero"), (None, None)]
+    assert properties.rig_conversion_properties[0].mesh_object.name == "Body"
+
+    exported = manifest.export_manifest(properties)
+    import_manifest(scene, exported)
+    assert manifest.export_manifest(properties) == exported
+    assert len(properties.action_groups) == 1
+
+def changed_manifest(change):
+    values = copy.deepcopy(VALID_MANIFEST)
+    change(values)
+    return values
+
+@pytest.mark.parametrize("values", [
+    [],
+    {"version": manifest.MANIFEST_VERSION + 1},
+    {"version": manifest.MANIFEST_VERSION, "action_groups": {}},
+    {"version": manifest.MANIFEST_VERSION, "action_groups": ["Walk"]},
+    changed_manifest(lambda x: x["action_groups"][0].pop("name")),
+    changed_manifest(lambda x: x["action_groups"][0]["settings"].update(frame_range_source="BOGUS")),
+    changed_manifest(lambda x: x["action_groups"][0]["settings"].update(use_keyframe_reduction="yes")),
+    changed_manifest(lambda x: x["action_groups"][0]["settings"].update(location_tolerance=-1.0)),
+    changed_manifest(lambda x: x["action_groups"][0]["settings"].update(unknown_setting=1)),
+    changed_manifest(lambda x: x["action_groups"][0]["action_assignments"][0].update(action=1)),
+    changed_manifest(lambda x: x["action_groups"][0]["action_assignments"][0].update(rig="Body")),
+    changed_manifest(lambda x: x["rig_conversion_properties"][0].update(rig="Body")),
+    changed_manifest(lambda x: x["rig_conversion_properties"][0].pop("rig")),
+    changed_manifest(lambda x: x["rig_conversion_properties"][0].update(mesh="Hero")),
+    changed_manifest(lambda x: x["rig_conversion_properties"][0]["settings"].update(rig_root_name=None)),
+])
+def test_bad_manifests_are_rejected_without_changes(scene, values):
+    properties = scene.action_organizer
+    action_group = properties.action_groups.add()
+    action_group.name = "Walk"
+    action_group.action_assignments.add().action = bpy.data.actions["walk"]
+
+    with pytest.raises(ValueError):
+        import_manifest(scene, values)
+    assert len(properties.action_groups) == 1
+    assert action_group.frame_range_source == "ACTION"
+    assert len(action_group.action_assignments) == 1
+    assert len(properties.rig_conversion_properties) == 0
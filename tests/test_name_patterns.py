@@ -0,0 +1,32 @@
+import pytest
+
+from addon_loader import load_standalone_module
+
+name_patterns = load_standalone_module("name_patterns")
+
+class Action:
+    def __init__(self, name):
+        self.name = name
+
+def test_rig_names_with_underscores_are_matched_longest_first():
+    expression = name_patterns.compile_action_name_pattern("{group}_{rig}", ["Hero", "Hero_Sword", "Prop"])
+    actions = [Action(x) for x in ("Walk_Hero_Sword", "Walk_Hero", "Jump_Up_Prop", "Walk_Nobody", "Unrelated")]
+    matches = name_patterns.match_action_names(actions, expression)
+    assert {group: {rig: action.name for rig, action in rigs.items()} for group, rigs in matches.items()} == {
+        "Walk": {"Hero_Sword": "Walk_Hero_Sword", "Hero": "Walk_Hero"},
+        "Jump_Up": {"Prop": "Jump_Up_Prop"},
+    }
+
+def test_literal_parts_of_the_pattern_are_escaped():
+    expression = name_patterns.compile_action_name_pattern("{rig}.{group}", ["Hero"])
+    assert expression.fullmatch("Hero.Walk") != None
+    assert expression.fullmatch("HeroxWalk") == None
+
+@pytest.mark.parametrize("pattern", ["{group}", "{group}_{rig}_{rig}", "{group}_{rig}_{action}"])
+def test_unusable_patterns_are_rejected(pattern):
+    with pytest.raises(ValueError):
+        name_patterns.compile_action_name_pattern(pattern, ["Hero"])
+
+def test_pattern_needs_rigs():
+    with pytest.raises(ValueError):
+        name_patterns.compile_action_name_pattern("{group}_{rig}", [])
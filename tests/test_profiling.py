@@ -0,0 +1,39 @@
+import pytest
+
+from addon_loader import load_standalone_module
+
+profiling = load_standalone_module("profiling")
+
+def convert(profiler, name, frames, fail=False):
+    with profiler.group(name) as timing:
+        with profiler.section("bake"):
+            if fail:
+                raise RuntimeError("Conversion failed")
+        timing.frames = frames
+
+def test_failed_groups_are_left_out_of_the_summary():
+    profiler = profiling.BakeProfiler()
+    convert(profiler, "walk", 100)
+    for name in ("run", "jump"):
+        with pytest.raises(RuntimeError):
+            convert(profiler, name, 0, fail=True)
+    profiler.finish()
+
+    assert [x.name for x in profiler.groups] == ["walk"]
+    assert profiler.current_group == None
+    lines = profiler.summary_lines()
+    assert lines[0].startswith("Converted 1 group(s)")
+    assert len(lines) == 2
+
+def test_sections_are_added_together():
+    profiler = profiling.BakeProfiler()
+    with profiler.group("walk"):
+        for _ in range(3):
+            with profiler.section("bake"):
+                pass
+        with profiler.rig("hero"):
+            pass
+    timing = profiler.groups[0]
+    assert list(timing.sections) == ["bake"]
+    assert [x[0] for x in timing.rigs] == ["hero"]
+    assert profiling.GroupTiming.from_dict(timing.as_dict()).sections == {"bake": round(timing.sections["bake"], 4)}
@@ -0,0 +1,52 @@
+import types
+
+import pytest
+
+bpy = pytest.importorskip("bpy")
+
+from addon_loader import load_module
+
+operator_module = load_module("action_organizer_operator")
+
+FILTER_FLAG = 1 << 30
+
+def get_list_state(filter_name, use_filter_invert=False, use_filter_sort_alpha=False):
+    # UI lists can not be created from Python, so filter_items is called with the filter settings it reads.
+    return types.SimpleNamespace(
+        filter_name=filter_name,
+        use_filter_invert=use_filter_invert,
+        use_filter_sort_alpha=use_filter_sort_alpha,
+        bitflag_filter_item=FILTER_FLAG,
+    )
+
+@pytest.fixture
+def properties(registered_addon):
+    properties = bpy.context.scene.action_organizer
+    for name in ("Walk", "Run", "Jump"):
+        properties.action_groups.add().name = name
+    actions = [bpy.data.actions.new(x) for x in ("walk", "run", "jump")]
+    for action in actions:
+        properties.action_groups[0].action_assignments.add().action = action
+    yield properties
+
+    properties.action_groups.clear()
+    for action in actions:
+        bpy.data.actions.remove(action)
+
+@pytest.mark.parametrize("use_filter_invert, expected_flags", [(False, [0, FILTER_FLAG, 0]), (True, [FILTER_FLAG, 0, FILTER_FLAG])])
+def test_action_group_filter_can_be_inverted(properties, use_filter_invert, expected_flags):
+    flags, order = operator_module.ACTION_ORGANIZER_UL_ActionGroup.filter_items(get_list_state("un", use_filter_invert), bpy.context, properties, "action_groups")
+    assert flags == expected_flags
+
+@pytest.mark.parametrize("use_filter_invert, expected_flags", [(False, [0, FILTER_FLAG, 0]), (True, [FILTER_FLAG, 0, FILTER_FLAG])])
+def test_action_assignment_filter_can_be_inverted(properties, use_filter_invert, expected_flags):
+    action_group = properties.action_groups[0]
+    flags, order = operator_module.ACTION_ORGANIZER_UL_ActionAssignment.filter_items(get_list_state("RUN", use_filter_invert), bpy.context, action_group, "action_assignments")
+    assert flags == expected_flags
+
+def test_action_assignments_are_sorted_by_name(properties):
+    action_group = properties.action_groups[0]
+    flags, order = operator_module.ACTION_ORGANIZER_UL_ActionAssignment.filter_items(get_list_state("", use_filter_sort_alpha=True), bpy.context, action_group, "action_assignments")
+    assert flags == []
+    # The order gives the position of each item in the sorted list.
+    assert order == [2, 1, 0]